@@ -219,18 +219,20 @@ async def health_check(db: Session = Depends(get_db)):
         model_status = _get_ml_service().get_model_status()
         
         # Get recent statistics
+        now = datetime.now()
+        hour_ago = now - timedelta(hours=1)
         recent_alerts = db.query(Alert).filter(
-            Alert.timestamp >= datetime.now() - timedelta(hours=1)
+            Alert.timestamp >= hour_ago
         ).count()
         
         recent_packets = db.query(Metric).filter(
-            Metric.timestamp >= datetime.now() - timedelta(hours=1),
+            Metric.timestamp >= hour_ago,
             Metric.metric_type == "packet_volume"
         ).count()
         
         return schemas.HealthResponse(
             status="healthy" if db_status == "healthy" and model_status.get("models_loaded", False) else "degraded",
-            timestamp=datetime.now(),
+            timestamp=now,
             database=db_status,
             models=model_status,
             statistics={
@@ -6,12 +6,13 @@ from sqlalchemy import func
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
-import json
 import os
 
+import orjson
+
 from app.database import get_db
 from app.models import Alert, Metric, ModelPerformance
-from app.config import settings
+from app.services.report_service import get_reports_dir
 
 router = APIRouter()
 
@@ -165,7 +166,7 @@ async def get_stats_timeline(
 
 def _get_reports_dir() -> Path:
     """Get the capture reports directory path."""
-    return Path(settings.DATA_PATH) / "capture_reports"
+    return get_reports_dir()
 
 
 @router.get("/reports/captures")
@@ -219,8 +220,7 @@ async def list_capture_reports(
             
             # Load report summary
             try:
-                with report_path.open("r", encoding="utf-8") as f:
-                    report_data = json.load(f)
+                report_data = orjson.loads(report_path.read_bytes())
                 
                 # Check for associated CSV files
                 packets_csv = reports_dir / f"{filename}_packets.csv"
@@ -240,7 +240,7 @@ async def list_capture_reports(
                     "has_alerts_csv": alerts_csv.exists(),
                     "file_size": report_path.stat().st_size
                 })
-            except (json.JSONDecodeError, IOError):
+            except (orjson.JSONDecodeError, IOError):
                 continue
         
         # Sort by timestamp descending (newest first)
@@ -272,8 +272,7 @@ async def get_capture_report(report_id: str):
         if not report_path.exists():
             raise HTTPException(status_code=404, detail="Report not found")
         
-        with report_path.open("r", encoding="utf-8") as f:
-            report_data = json.load(f)
+        report_data = orjson.loads(report_path.read_bytes())
         
         # Add download URLs
         packets_csv = reports_dir / f"capture_report_{report_id}_packets.csv"
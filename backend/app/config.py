@@ -43,6 +43,9 @@ class Settings(BaseSettings):
     RAW_DATA_PATH: str = "./data/raw"
     PROCESSED_DATA_PATH: str = "./data/processed"
     
+    # On-disk cache for expensive analysis results (e.g. permutation importance)
+    CACHE_PATH: str = "./cache"
+    
     # Packet capture
     INTERFACE: Optional[str] = None  # Auto-detect if None
     CAPTURE_FILTER: str = "tcp or udp"
@@ -80,4 +83,5 @@ os.makedirs(settings.HYBRID_MODEL_PATH, exist_ok=True)
 os.makedirs(settings.DATA_PATH, exist_ok=True)
 os.makedirs(settings.RAW_DATA_PATH, exist_ok=True)
 os.makedirs(settings.PROCESSED_DATA_PATH, exist_ok=True)
+os.makedirs(settings.CACHE_PATH, exist_ok=True)
 
@@ -14,10 +14,10 @@ Design goals
 
 from __future__ import annotations
 
-import json
 import logging
 from typing import Set
 
+import orjson
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
@@ -68,7 +68,7 @@ class ChannelBroadcaster:
         if not self._connections:
             return
 
-        message = json.dumps(payload)
+        message = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
         stale: list[WebSocket] = []
 
         for ws in self._connections:
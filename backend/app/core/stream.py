@@ -109,6 +109,7 @@ class MetricsSnapshot:
     alerts_generated: int
     malicious_count: int
     packets_per_second: float
+    packets_last_minute: int = 0
 
     def to_dict(self) -> dict:
         """Serialise for WebSocket broadcast."""
@@ -119,4 +120,5 @@ class MetricsSnapshot:
             "alerts_generated": self.alerts_generated,
             "malicious_count": self.malicious_count,
             "packets_per_second": round(float(self.packets_per_second), 2),
+            "packets_last_minute": self.packets_last_minute,
         }
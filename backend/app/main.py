@@ -1,6 +1,11 @@
 """Main FastAPI application"""
 import sys
 import os
+import logging
+
+# Headless server: any matplotlib import (e.g. SHAP plotting) goes straight
+# to the Agg backend instead of probing for a GUI toolkit
+os.environ.setdefault("MPLBACKEND", "Agg")
 
 # Adding project root to sys.path preventing ImportErrors
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +16,9 @@ from app.config import settings
 from app.api import routes, websocket
 from app.database import init_db
 
+# Configure logging once at the entry point; library modules only create loggers
+logging.basicConfig(level=logging.INFO)
+
 # The Creation FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
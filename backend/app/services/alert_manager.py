@@ -6,7 +6,6 @@ from app.models import Alert
 from app.config import settings
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -17,11 +17,15 @@ Architecture:
 """
 
 import logging
+from dataclasses import dataclass, fields
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import sys
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
 # Add backend to path for ML imports
 backend_dir = Path(__file__).resolve().parent.parent.parent
 if str(backend_dir) not in sys.path:
@@ -56,6 +60,70 @@ def get_signature_detector():
     return _signature_detector
 
 
+# Code tables for the int8 columns of BatchResult
+SEVERITY_LEVELS = ('low', 'medium', 'high', 'critical')
+DETECTION_METHODS = ('none', 'signature', 'hybrid_confirmed', 'ml_primary')
+DECISION_PATHS = (
+    'signature_high_confidence',
+    'signature_ml_agreement',
+    'signature_ml_conflict',
+    'ml_high_confidence',
+    'ml_low_confidence',
+)
+
+# Columns stored as codes, mapped back to strings by BatchResult.to_records()
+_CODED_COLUMNS = {
+    'severity': SEVERITY_LEVELS,
+    'detection_method': DETECTION_METHODS,
+    'decision_path': DECISION_PATHS,
+}
+
+
+@dataclass
+class BatchResult:
+    """Struct-of-arrays detection results for a batch, one entry per packet.
+    
+    Severity, detection method and decision path are int8 codes into
+    SEVERITY_LEVELS, DETECTION_METHODS and DECISION_PATHS, so aggregations
+    such as severity_counts() stay in NumPy. to_records() produces the same
+    per-packet dicts as DetectionEngine.detect_packet.
+    """
+    is_malicious: np.ndarray
+    threat_score: np.ndarray
+    confidence: np.ndarray
+    severity: np.ndarray
+    attack_type: np.ndarray
+    detection_method: np.ndarray
+    signature_match: np.ndarray
+    signature_confidence: np.ndarray
+    signature_name: np.ndarray
+    ml_prediction: np.ndarray
+    ml_confidence: np.ndarray
+    supervised_prediction: np.ndarray
+    unsupervised_prediction: np.ndarray
+    anomaly_score: np.ndarray
+    hybrid_score: np.ndarray
+    decision_path: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.is_malicious)
+    
+    def severity_counts(self) -> Dict[str, int]:
+        """Number of packets at each severity level."""
+        counts = np.bincount(self.severity, minlength=len(SEVERITY_LEVELS))
+        return dict(zip(SEVERITY_LEVELS, counts.tolist()))
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Materialise per-packet result dicts (one .tolist() per column)."""
+        columns = {}
+        for f in fields(self):
+            values = getattr(self, f.name).tolist()
+            labels = _CODED_COLUMNS.get(f.name)
+            columns[f.name] = [labels[v] for v in values] if labels else values
+        names = list(columns)
+        return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
 class DetectionEngine:
     """
     Detection Engine - Central orchestrator for the hybrid NIDS.
@@ -176,12 +244,12 @@ class DetectionEngine:
             return False, 0.0, 'Normal'
         
         try:
-            import pandas as pd
             # Convert dict to Series for signature detector
             row = pd.Series(packet_data)
             return self.signature_detector.detect(row)
         except Exception as e:
-            logger.debug(f"Signature detection skipped: {e}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Signature detection skipped: {e}")
             return False, 0.0, 'Normal'
     
     def _fuse_detections(
@@ -288,17 +356,124 @@ class DetectionEngine:
         ranks = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
         return ranks.get(severity, 0)
     
-    def detect_batch(self, packet_list: List[Dict]) -> List[Dict]:
+    def detect_batch(self, packet_list: List[Dict]) -> BatchResult:
         """
         Perform hybrid detection on a batch of packets.
         
+        Signatures are evaluated over the whole batch at once and the fusion
+        rules of _fuse_detections are applied as array operations.
+        
         Args:
             packet_list: List of packet data dictionaries
             
         Returns:
-            List of detection results
+            BatchResult with one entry per packet
         """
-        return [self.detect_packet(packet) for packet in packet_list]
+        n = len(packet_list)
+        self.stats['total_packets'] += n
+        
+        # Step 1: Signature-based detection for the whole batch
+        sig_matched = np.zeros(n, dtype=bool)
+        sig_confidence = np.zeros(n)
+        sig_name = np.full(n, 'Normal', dtype=object)
+        if self.signature_detector is not None and n:
+            try:
+                matched, confidence, name_idx = self.signature_detector.check_signatures_batch(
+                    pd.DataFrame(packet_list)
+                )
+                names = np.array(self.signature_detector.signature_names, dtype=object)
+                sig_matched = matched
+                sig_confidence = confidence
+                sig_name[matched] = names[name_idx[matched]]
+            except Exception as e:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Signature detection skipped: {e}")
+        
+        # Step 2: ML-based detection
+        ml_malicious = np.zeros(n, dtype=bool)
+        ml_confidence = np.zeros(n)
+        ml_severity = np.zeros(n, dtype=np.int8)
+        ml_attack_type = np.full(n, 'Normal', dtype=object)
+        supervised_pred = np.zeros(n, dtype=np.int8)
+        unsupervised_pred = np.zeros(n, dtype=np.int8)
+        anomaly_score = np.zeros(n)
+        for i, ml_result in enumerate(self.ml_service.predict_batch(packet_list)):
+            ml_malicious[i] = ml_result.get('is_malicious', False)
+            ml_confidence[i] = ml_result.get('ml_confidence', 0.0)
+            ml_severity[i] = self._severity_rank(ml_result.get('severity', 'low'))
+            ml_attack_type[i] = ml_result.get('attack_type', 'Normal')
+            supervised_pred[i] = ml_result.get('supervised_prediction', 0)
+            unsupervised_pred[i] = ml_result.get('unsupervised_prediction', 0)
+            anomaly_score[i] = ml_result.get('unsupervised_confidence', 0.0)
+        
+        # Step 3: Fusion algorithm, branch by branch as in _fuse_detections
+        hybrid_score = self.signature_weight * sig_confidence + self.ml_weight * ml_confidence
+        high = sig_confidence > 0.8
+        medium = ~high & (sig_confidence > 0.5)
+        low = ~high & ~medium
+        branches = [
+            high,
+            medium & (ml_confidence > 0.6),
+            medium & (ml_confidence <= 0.6),
+            low & (ml_confidence > 0.7),
+        ]
+        decision_path = np.select(branches, [0, 1, 2, 3], default=4).astype(np.int8)
+        is_malicious = (decision_path <= 1) | (decision_path == 3)
+        threat_score = np.select(
+            branches,
+            [sig_confidence, hybrid_score, 1 - sig_confidence, ml_confidence],
+            default=np.maximum(sig_confidence, ml_confidence),
+        )
+        confidence = np.select(
+            branches,
+            [sig_confidence, hybrid_score, 1 - sig_confidence, ml_confidence],
+            default=1 - ml_confidence,
+        )
+        severity = np.select(
+            branches,
+            [
+                self._severity_codes(sig_confidence),
+                np.maximum(self._severity_codes(hybrid_score), ml_severity),
+                0,
+                ml_severity,
+            ],
+            default=0,
+        ).astype(np.int8)
+        detection_method = np.select(branches, [1, 2, 0, 3], default=0).astype(np.int8)
+        attack_type = np.where(
+            branches[0] | (branches[1] & (sig_name != 'Normal')),
+            sig_name,
+            np.where(branches[1] | branches[3], ml_attack_type, 'Normal'),
+        )
+        
+        self.stats['signature_detections'] += int(sig_matched.sum())
+        self.stats['ml_detections'] += int(ml_malicious.sum())
+        self.stats['conflicts'] += int(branches[2].sum())
+        self.stats['hybrid_detections'] += int(is_malicious.sum())
+        
+        return BatchResult(
+            is_malicious=is_malicious,
+            threat_score=threat_score,
+            confidence=confidence,
+            severity=severity,
+            attack_type=attack_type,
+            detection_method=detection_method,
+            signature_match=sig_matched,
+            signature_confidence=sig_confidence,
+            signature_name=sig_name,
+            ml_prediction=supervised_pred.astype(float),
+            ml_confidence=ml_confidence,
+            supervised_prediction=supervised_pred,
+            unsupervised_prediction=unsupervised_pred,
+            anomaly_score=anomaly_score,
+            hybrid_score=hybrid_score,
+            decision_path=decision_path,
+        )
+    
+    @staticmethod
+    def _severity_codes(scores: np.ndarray) -> np.ndarray:
+        """Vectorised _get_severity_from_score, as SEVERITY_LEVELS codes."""
+        return np.digitize(scores, [0.5, 0.7, 0.9]).astype(np.int8)
     
     def analyze_packet(self, packet_data: Dict) -> Dict[str, Any]:
         """
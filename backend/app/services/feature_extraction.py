@@ -6,7 +6,6 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
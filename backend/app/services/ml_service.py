@@ -10,9 +10,9 @@ import os
 import sys
 import logging
 from pathlib import Path
+from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 import numpy as np
-import pandas as pd
 import joblib
 
 # Compatibility shim: some existing pickled artifacts reference numpy._core.
@@ -139,6 +139,8 @@ class MLService:
                 logger.warning(f"Hybrid config not found at {hybrid_path}")
             
             self.models_loaded = self.supervised_model is not None
+            if self.models_loaded:
+                self._warm_up()
             return self.models_loaded
             
         except Exception as e:
@@ -146,6 +148,16 @@ class MLService:
             self.models_loaded = False
             return False
     
+    def _warm_up(self) -> None:
+        """
+        Score one dummy packet right after loading.
+        
+        First calls into the unpickled estimators pay one-off setup (thread
+        pools, native library initialisation); doing it here keeps that cost
+        off the first live packet.
+        """
+        self.predict_batch([{'packet_size': 0, 'protocol': 'TCP'}])
+    
     def preprocess_packet(self, packet_data: Dict) -> Optional[np.ndarray]:
         """
         Preprocess a single packet for ML inference.
@@ -157,9 +169,6 @@ class MLService:
             Preprocessed feature vector or None if preprocessing fails
         """
         try:
-            # Create DataFrame from packet data
-            df = pd.DataFrame([packet_data])
-            
             # If preprocessor is loaded, use it
             if self.preprocessor and isinstance(self.preprocessor, dict):
                 scaler = self.preprocessor.get('scaler')
@@ -170,20 +179,20 @@ class MLService:
                 
                 if scaler and len(feature_vector) > 0:
                     # Ensure feature vector matches expected dimensions
-                    feature_array = np.array(feature_vector).reshape(1, -1)
+                    feature_array = np.asarray(feature_vector, dtype=np.float32).reshape(1, -1)
                     if feature_array.shape[1] == scaler.n_features_in_:
                         return scaler.transform(feature_array)[0]
                     else:
                         # Pad or truncate to match expected features
-                        padded = np.zeros((1, scaler.n_features_in_))
+                        padded = np.zeros((1, scaler.n_features_in_), dtype=np.float32)
                         n = min(feature_array.shape[1], scaler.n_features_in_)
                         padded[0, :n] = feature_array[0, :n]
                         return scaler.transform(padded)[0]
                         
-                return np.array(feature_vector)
+                return np.asarray(feature_vector, dtype=np.float32)
             else:
                 # Fallback: extract basic features without preprocessing
-                return np.array(self._extract_features(packet_data))
+                return np.asarray(self._extract_features(packet_data), dtype=np.float32)
                 
         except Exception as e:
             logger.error(f"Error preprocessing packet: {e}")
@@ -208,7 +217,6 @@ class MLService:
         # Time-based features (if timestamp present)
         timestamp = packet_data.get('timestamp')
         if timestamp:
-            from datetime import datetime
             if isinstance(timestamp, str):
                 try:
                     timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
@@ -235,12 +243,13 @@ class MLService:
             return 0, 0.0
             
         try:
+            features = np.asarray(features, dtype=np.float32)
             features_2d = features.reshape(1, -1) if features.ndim == 1 else features
             
             # Handle feature dimension mismatch
             expected_features = getattr(self.supervised_model, 'n_features_in_', None)
             if expected_features and features_2d.shape[1] != expected_features:
-                padded = np.zeros((1, expected_features))
+                padded = np.zeros((1, expected_features), dtype=np.float32)
                 n = min(features_2d.shape[1], expected_features)
                 padded[0, :n] = features_2d[0, :n]
                 features_2d = padded
@@ -271,26 +280,28 @@ class MLService:
             return 0, 0.0
             
         try:
+            features = np.asarray(features, dtype=np.float32)
             features_2d = features.reshape(1, -1) if features.ndim == 1 else features
             
             # Handle feature dimension mismatch
             expected_features = getattr(self.unsupervised_model, 'n_features_in_', None)
             if expected_features and features_2d.shape[1] != expected_features:
-                padded = np.zeros((1, expected_features))
+                padded = np.zeros((1, expected_features), dtype=np.float32)
                 n = min(features_2d.shape[1], expected_features)
                 padded[0, :n] = features_2d[0, :n]
                 features_2d = padded
             
-            # Isolation Forest returns -1 for anomalies, 1 for normal
-            prediction = self.unsupervised_model.predict(features_2d)[0]
-            is_anomaly = 1 if prediction == -1 else 0
-            
-            # Get anomaly score using decision function
+            # Get anomaly score using decision function; predict() would
+            # walk every tree again just to threshold the same value at 0
             if hasattr(self.unsupervised_model, 'decision_function'):
                 score = -self.unsupervised_model.decision_function(features_2d)[0]
+                is_anomaly = 1 if score > 0 else 0
                 # Normalize score to 0-1 range
                 anomaly_score = float(max(0.0, min(1.0, (score + 0.5) / 1.0)))
             else:
+                # Isolation Forest returns -1 for anomalies, 1 for normal
+                prediction = self.unsupervised_model.predict(features_2d)[0]
+                is_anomaly = 1 if prediction == -1 else 0
                 anomaly_score = 0.7 if is_anomaly else 0.3
                 
             return is_anomaly, anomaly_score
@@ -376,13 +387,147 @@ class MLService:
         """
         Run hybrid detection on a batch of packets.
         
+        Features are stacked into one matrix so the scaler and each model are
+        called once for the batch; results match predict() packet by packet.
+        
         Args:
             packet_list: List of packet data dictionaries
             
         Returns:
             List of detection results
         """
-        return [self.predict(packet) for packet in packet_list]
+        n = len(packet_list)
+        results = [{
+            'is_malicious': False,
+            'threat_score': 0.0,
+            'confidence': 0.0,
+            'attack_type': 'Normal',
+            'severity': 'low',
+            'detection_method': 'none',
+            'supervised_prediction': 0,
+            'supervised_confidence': 0.0,
+            'unsupervised_prediction': 0,
+            'unsupervised_confidence': 0.0,
+            'ml_confidence': 0.0,
+        } for _ in range(n)]
+        if n == 0:
+            return results
+        
+        try:
+            X, valid = self._preprocess_batch(packet_list)
+            sup_pred, sup_conf = self._predict_supervised_batch(X)
+            unsup_pred, unsup_conf = self._predict_unsupervised_batch(X)
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            return results
+        
+        # Fusion: same weighted vote and threshold as predict()
+        ml_confidence = self.supervised_weight * sup_conf + self.unsupervised_weight * unsup_conf
+        weighted_vote = self.supervised_weight * sup_pred + self.unsupervised_weight * unsup_pred
+        is_attack = (weighted_vote > 0.5) | (ml_confidence > 0.7)
+        
+        for i in np.flatnonzero(valid).tolist():
+            result = results[i]
+            confidence = float(ml_confidence[i])
+            result['supervised_prediction'] = int(sup_pred[i])
+            result['supervised_confidence'] = float(sup_conf[i])
+            result['unsupervised_prediction'] = int(unsup_pred[i])
+            result['unsupervised_confidence'] = float(unsup_conf[i])
+            result['ml_confidence'] = confidence
+            result['threat_score'] = confidence
+            result['confidence'] = confidence
+            if is_attack[i]:
+                result['is_malicious'] = True
+                result['detection_method'] = 'ml_hybrid'
+                result['severity'] = self._calculate_severity(confidence)
+                result['attack_type'] = self._determine_attack_type(
+                    int(sup_pred[i]), int(unsup_pred[i]), packet_list[i]
+                )
+        
+        return results
+    
+    def _preprocess_batch(self, packet_list: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Feature matrix for a batch plus a mask of packets that preprocessed.
+        
+        Packets whose features cannot be extracted get a zero row and are
+        reported as not valid, like preprocess_packet returning None.
+        """
+        n = len(packet_list)
+        valid = np.ones(n, dtype=bool)
+        # _extract_features has a fixed width, so the matrix is allocated on
+        # the first packet and every row is written into it by index
+        X = None
+        for i, packet in enumerate(packet_list):
+            try:
+                row = self._extract_features(packet)
+            except Exception as e:
+                logger.error(f"Error preprocessing packet: {e}")
+                valid[i] = False
+                continue
+            if X is None:
+                X = np.zeros((n, len(row)), dtype=np.float32)
+            X[i] = row
+        if X is None:
+            X = np.zeros((n, 0), dtype=np.float32)
+        
+        scaler = self.preprocessor.get('scaler') if isinstance(self.preprocessor, dict) else None
+        if scaler and X.shape[1] > 0:
+            X = scaler.transform(self._fit_width(X, scaler.n_features_in_))
+        return X, valid
+    
+    @staticmethod
+    def _fit_width(X: np.ndarray, expected_features: Optional[int]) -> np.ndarray:
+        """Zero-pad or truncate feature columns to what a model expects."""
+        if not expected_features or X.shape[1] == expected_features:
+            return X
+        fitted = np.zeros((X.shape[0], expected_features), dtype=np.float32)
+        n = min(X.shape[1], expected_features)
+        fitted[:, :n] = X[:, :n]
+        return fitted
+    
+    def _predict_supervised_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Batch counterpart of predict_supervised."""
+        n = X.shape[0]
+        if self.supervised_model is None:
+            return np.zeros(n, dtype=int), np.zeros(n)
+        try:
+            X = self._fit_width(
+                np.asarray(X, dtype=np.float32),
+                getattr(self.supervised_model, 'n_features_in_', None)
+            )
+            prediction = np.asarray(self.supervised_model.predict(X), dtype=int)
+            if hasattr(self.supervised_model, 'predict_proba'):
+                proba = self.supervised_model.predict_proba(X)
+                confidence = proba[:, 1] if proba.shape[1] > 1 else proba[:, 0]
+            else:
+                confidence = (prediction == 1).astype(float)
+            return prediction, confidence
+        except Exception as e:
+            logger.error(f"Supervised prediction error: {e}")
+            return np.zeros(n, dtype=int), np.zeros(n)
+    
+    def _predict_unsupervised_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Batch counterpart of predict_unsupervised."""
+        n = X.shape[0]
+        if self.unsupervised_model is None:
+            return np.zeros(n, dtype=int), np.zeros(n)
+        try:
+            X = self._fit_width(
+                np.asarray(X, dtype=np.float32),
+                getattr(self.unsupervised_model, 'n_features_in_', None)
+            )
+            if hasattr(self.unsupervised_model, 'decision_function'):
+                score = -self.unsupervised_model.decision_function(X)
+                is_anomaly = (score > 0).astype(int)
+                anomaly_score = np.clip(score + 0.5, 0.0, 1.0)
+            else:
+                is_anomaly = (self.unsupervised_model.predict(X) == -1).astype(int)
+                anomaly_score = np.where(is_anomaly == 1, 0.7, 0.3)
+            return is_anomaly, anomaly_score
+        except Exception as e:
+            logger.error(f"Unsupervised prediction error: {e}")
+            return np.zeros(n, dtype=int), np.zeros(n)
     
     def _calculate_severity(self, threat_score: float) -> str:
         """Calculate severity based on threat score."""
@@ -15,7 +15,6 @@ from app.config import settings
 from app.models import ModelPerformance
 from app.database import SessionLocal
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +26,9 @@ class ModelService:
         self.unsupervised_trainer = UnsupervisedModelTrainer()
         self.online_learner = OnlineLearner()
         self.shap_analyzer = SHAPAnalyzer()
-        self.feature_importance_analyzer = FeatureImportanceAnalyzer()
+        self.feature_importance_analyzer = FeatureImportanceAnalyzer(
+            cache_dir=str(Path(settings.CACHE_PATH) / "perm_importance")
+        )
     
     def get_feature_importance(self, model_name: Optional[str] = None) -> Dict:
         """Get feature importance for models"""
@@ -4,44 +4,43 @@ These reports summarize packets and alerts seen over a recent time window and
 are stored on disk so operators can review them later.
 """
 
+from collections import Counter
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, Dict, Any
-import json
 import csv
 
+import orjson
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models import Packet, Alert
 
 
+def get_reports_dir() -> Path:
+    """Return the capture reports directory path.
+
+    The directory is not created here; callers that write reports must make
+    sure it exists.
+    """
+    return Path(settings.DATA_PATH) / "capture_reports"
+
+
 def _build_summary(packets, alerts, now: datetime, window_minutes: int) -> Dict[str, Any]:
     """Build an in-memory summary structure for JSON export."""
-    now = datetime.now()
     packet_sizes = [p.packet_size for p in packets if p.packet_size is not None]
     packet_count = len(packets)
     alert_count = len(alerts)
 
     # Per-severity breakdown
-    severity_counts: Dict[str, int] = {}
-    for a in alerts:
-        if not a.severity:
-            continue
-        severity_counts[a.severity] = severity_counts.get(a.severity, 0) + 1
+    severity_counts = Counter(a.severity for a in alerts if a.severity)
 
     # Top talkers (by source IP)
-    src_counts: Dict[str, int] = {}
-    for p in packets:
-        if p.src_ip:
-            src_counts[p.src_ip] = src_counts.get(p.src_ip, 0) + 1
-    top_sources = sorted(src_counts.items(), key=lambda kv: kv[1], reverse=True)[:10]
+    src_counts = Counter(p.src_ip for p in packets if p.src_ip)
+    top_sources = src_counts.most_common(10)
 
     # Protocol distribution
-    proto_counts: Dict[str, int] = {}
-    for p in packets:
-        if p.protocol:
-            proto_counts[p.protocol] = proto_counts.get(p.protocol, 0) + 1
+    proto_counts = Counter(p.protocol for p in packets if p.protocol)
 
     # Summary structure
     return {
@@ -56,11 +55,11 @@ def _build_summary(packets, alerts, now: datetime, window_minutes: int) -> Dict[
                 sum(packet_sizes) / len(packet_sizes) if packet_sizes else 0
             ),
         },
-        "severity_breakdown": severity_counts,
+        "severity_breakdown": dict(severity_counts),
         "top_sources": [
             {"src_ip": ip, "packet_count": count} for ip, count in top_sources
         ],
-        "protocol_distribution": proto_counts,
+        "protocol_distribution": dict(proto_counts),
         # Sample a limited number of recent alerts to keep reports compact
         "alerts_sample": [
             {
@@ -99,19 +98,19 @@ def _write_csv_reports(
                 "packet_size",
             ]
         )
-        for p in packets:
-            writer.writerow(
-                [
-                    p.id,
-                    p.timestamp.isoformat() if p.timestamp else "",
-                    p.src_ip,
-                    p.dst_ip,
-                    p.src_port,
-                    p.dst_port,
-                    p.protocol,
-                    p.packet_size,
-                ]
+        writer.writerows(
+            (
+                p.id,
+                p.timestamp.isoformat() if p.timestamp else "",
+                p.src_ip,
+                p.dst_ip,
+                p.src_port,
+                p.dst_port,
+                p.protocol,
+                p.packet_size,
             )
+            for p in packets
+        )
 
     # Alerts CSV
     alerts_path = reports_dir / f"{base_name}_alerts.csv"
@@ -131,21 +130,21 @@ def _write_csv_reports(
                 "hybrid_score",
             ]
         )
-        for a in alerts:
-            writer.writerow(
-                [
-                    a.id,
-                    a.timestamp.isoformat() if a.timestamp else "",
-                    a.severity,
-                    a.alert_type,
-                    a.source_ip,
-                    a.destination_ip,
-                    a.protocol,
-                    a.description,
-                    a.threat_score,
-                    a.hybrid_score,
-                ]
+        writer.writerows(
+            (
+                a.id,
+                a.timestamp.isoformat() if a.timestamp else "",
+                a.severity,
+                a.alert_type,
+                a.source_ip,
+                a.destination_ip,
+                a.protocol,
+                a.description,
+                a.threat_score,
+                a.hybrid_score,
             )
+            for a in alerts
+        )
 
 
 def generate_capture_report(db: Session, window_minutes: int = 10) -> str:
@@ -161,7 +160,7 @@ def generate_capture_report(db: Session, window_minutes: int = 10) -> str:
     now = datetime.now()
     since = now - timedelta(minutes=window_minutes)
 
-    reports_dir = Path(settings.DATA_PATH) / "capture_reports"
+    reports_dir = get_reports_dir()
     reports_dir.mkdir(parents=True, exist_ok=True)
 
     # Query recent packets and alerts
@@ -183,8 +182,7 @@ def generate_capture_report(db: Session, window_minutes: int = 10) -> str:
     # JSON summary
     report = _build_summary(packets, alerts, now, window_minutes)
     report_path = reports_dir / f"{base_name}.json"
-    with report_path.open("w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2)
+    report_path.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
 
     # CSV exports
     _write_csv_reports(reports_dir, base_name, packets, alerts)
@@ -20,6 +20,8 @@ Key design decisions
 * Packets are processed in batches of 50-200 to amortise ML overhead.
 * The DB is only written when an alert is created — never per-packet.
 * Metrics are broadcast on a time-based schedule, not per-packet.
+* Blocking work (batch inference, SQLAlchemy writes) runs in worker threads
+  via the loop's default executor so broadcasts and capture are never starved.
 * Processing stops cleanly when stop() is called.
 """
 
@@ -27,8 +29,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import datetime
-from typing import List
+from typing import Deque, List
 
 from app.core.broadcaster import alert_broadcaster, metrics_broadcaster, packet_broadcaster
 from app.core.stream import AlertData, MetricsSnapshot, PacketData, packet_stream
@@ -44,6 +48,9 @@ BATCH_SIZE: int = 100
 # How often (in seconds) to emit a metrics snapshot.
 METRICS_INTERVAL_SECONDS: float = 5.0
 
+# Length (in one-second buckets) of the rolling packet-volume window.
+VOLUME_WINDOW_SECONDS: int = 60
+
 
 class PacketProcessingPipeline:
     """Async batch processing pipeline — consumes from packet_stream queue."""
@@ -63,6 +70,12 @@ class PacketProcessingPipeline:
         self._last_second_count: int = 0
         self._packets_per_second: float = 0.0
 
+        # Rolling per-second packet counts for the last minute — replaces
+        # a COUNT(*) range scan over the packets table at metrics time.
+        self._second_counts: Deque[int] = deque(maxlen=VOLUME_WINDOW_SECONDS)
+        self._current_second: int = int(time.monotonic())
+        self._current_second_count: int = 0
+
     # ------------------------------------------------------------------
     # Public control
     # ------------------------------------------------------------------
@@ -92,6 +105,9 @@ class PacketProcessingPipeline:
         self._alerts_generated = 0
         self._malicious_count = 0
         self._last_metrics_time = datetime.now()
+        self._second_counts.clear()
+        self._current_second = int(time.monotonic())
+        self._current_second_count = 0
 
         logger.info("Processing pipeline started (batch_size=%d)", BATCH_SIZE)
 
@@ -152,12 +168,18 @@ class PacketProcessingPipeline:
         # Convert to plain dicts for the detection engine
         packet_dicts = [self._packet_data_to_feature_dict(p) for p in batch]
 
-        # Batch ML inference — runs synchronously but is fast enough in-process
-        detection_results = self._detection_engine.detect_batch(packet_dicts)
+        # Batch ML inference — offloaded so the event loop keeps serving sockets
+        loop = asyncio.get_running_loop()
+        detection_results = await loop.run_in_executor(
+            None, self._detection_engine.detect_batch, packet_dicts
+        )
+
+        # Columnar results; per-packet dicts are only built for the broadcast
+        records = detection_results.to_records()
 
         db = SessionLocal()
         try:
-            for packet_data, detection_result in zip(batch, detection_results):
+            for packet_data, detection_result in zip(batch, records):
                 is_malicious = detection_result.get("is_malicious", False)
 
                 # 1. Broadcast raw packet to /ws/packets (every packet)
@@ -186,7 +208,9 @@ class PacketProcessingPipeline:
                         "destination_ip": packet_data.dst_ip,
                         "protocol": packet_data.protocol,
                     }
-                    alert = self._alert_manager.create_alert(db, alert_payload)
+                    alert = await loop.run_in_executor(
+                        None, self._alert_manager.create_alert, db, alert_payload
+                    )
 
                     if alert:
                         self._alerts_generated += 1
@@ -213,6 +237,29 @@ class PacketProcessingPipeline:
             logger.error("Error processing batch: %s", exc, exc_info=True)
         finally:
             db.close()
+            self._record_volume(len(batch))
+
+    def _rotate_volume_window(self) -> None:
+        """Close out elapsed one-second buckets, padding idle seconds with 0."""
+        second = int(time.monotonic())
+        elapsed = second - self._current_second
+        if elapsed <= 0:
+            return
+
+        self._second_counts.append(self._current_second_count)
+        self._second_counts.extend([0] * min(elapsed - 1, VOLUME_WINDOW_SECONDS))
+        self._current_second = second
+        self._current_second_count = 0
+
+    def _record_volume(self, count: int) -> None:
+        """Add *count* processed packets to the current one-second bucket."""
+        self._rotate_volume_window()
+        self._current_second_count += count
+
+    def _packets_last_minute(self) -> int:
+        """Packets processed over the rolling window — no DB reads."""
+        self._rotate_volume_window()
+        return sum(self._second_counts) + self._current_second_count
 
     async def _maybe_broadcast_metrics(self) -> None:
         """Emit a MetricsSnapshot if enough time has elapsed."""
@@ -234,6 +281,7 @@ class PacketProcessingPipeline:
             alerts_generated=self._alerts_generated,
             malicious_count=self._malicious_count,
             packets_per_second=pps,
+            packets_last_minute=self._packets_last_minute(),
         )
 
         await metrics_broadcaster.broadcast({
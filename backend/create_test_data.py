@@ -2,49 +2,68 @@
 from app.database import SessionLocal, init_db
 from app.models import Alert, Metric, ModelPerformance
 from datetime import datetime, timedelta
-import random
+import numpy as np
 
 def create_test_data():
     """Create test data for dashboard"""
     # Initialize database 
     init_db()
     
+    # Read the clock once and draw every random column up front so the
+    # loops below only assemble rows (seeded for reproducible test data)
+    now = datetime.now()
+    rng = np.random.default_rng(0)
+    n_metrics = 10
+    n_alerts = 15
+    
     db = SessionLocal()
     try:
         # Create test metrics
         print("Creating test metrics...")
-        for i in range(10):
+        volumes = rng.integers(100, 1001, n_metrics)
+        for i, volume in enumerate(volumes.tolist()):
             metric = Metric(
-                timestamp=datetime.now() - timedelta(minutes=i*5),
+                timestamp=now - timedelta(minutes=i*5),
                 metric_type="packet_volume",
-                value=random.randint(100, 1000),
+                value=volume,
                 metric_metadata={}
             )
             db.add(metric)
         
         # Create test alerts
         print("Creating test alerts...")
-        severities = ['low', 'medium', 'high']
-        alert_types = ['known_attack', 'zero_day', 'suspicious']
+        severities = rng.choice(['low', 'medium', 'high'], n_alerts).tolist()
+        alert_types = rng.choice(['known_attack', 'zero_day', 'suspicious'], n_alerts).tolist()
+        protocols = rng.choice(['TCP', 'UDP', 'ICMP'], n_alerts).tolist()
+        methods = rng.choice(['signature', 'ml', 'hybrid'], n_alerts).tolist()
+        # Addresses are formatted for the whole batch at once
+        src_ips = np.char.add('192.168.1.', rng.integers(1, 256, n_alerts).astype(str)).tolist()
+        dst_ips = np.char.add('10.0.0.', rng.integers(1, 256, n_alerts).astype(str)).tolist()
+        threat_scores = rng.uniform(0.5, 0.95, n_alerts).tolist()
+        ml_predictions = rng.uniform(0.4, 0.9, n_alerts).tolist()
+        hybrid_scores = rng.uniform(0.5, 0.95, n_alerts).tolist()
+        signature_flags = rng.integers(0, 2, n_alerts).astype(bool).tolist()
+        resolved_flags = rng.integers(0, 2, n_alerts).astype(bool).tolist()
         
-        for i in range(15):
-            severity = random.choice(severities)
+        for i, (severity, alert_type, protocol, method) in enumerate(
+            zip(severities, alert_types, protocols, methods)
+        ):
             alert = Alert(
-                timestamp=datetime.now() - timedelta(minutes=i*10),
+                timestamp=now - timedelta(minutes=i*10),
                 severity=severity,
-                alert_type=random.choice(alert_types),
-                source_ip=f"192.168.1.{random.randint(1, 255)}",
-                destination_ip=f"10.0.0.{random.randint(1, 255)}",
-                protocol=random.choice(['TCP', 'UDP', 'ICMP']),
+                alert_type=alert_type,
+                source_ip=src_ips[i],
+                destination_ip=dst_ips[i],
+                protocol=protocol,
                 description=f"Test alert {i+1}: {severity} severity attack detected",
-                threat_score=random.uniform(0.5, 0.95),
-                signature_match=random.choice([True, False]),
-                ml_prediction=random.uniform(0.4, 0.9),
-                hybrid_score=random.uniform(0.5, 0.95),
-                resolved=random.choice([True, False]) if i > 10 else False,
+                threat_score=threat_scores[i],
+                signature_match=signature_flags[i],
+                ml_prediction=ml_predictions[i],
+                hybrid_score=hybrid_scores[i],
+                resolved=resolved_flags[i] if i > 10 else False,
                 alert_metadata={
                     'test': True,
-                    'detection_method': random.choice(['signature', 'ml', 'hybrid'])
+                    'detection_method': method
                 }
             )
             db.add(alert)
@@ -52,29 +71,30 @@ def create_test_data():
         # Create test model performance
         print("Creating test model performance...")
         models = ['random_forest', 'xgboost', 'lightgbm', 'svm']
+        perf_timestamp = now - timedelta(hours=1)
         for model_name in models:
             perf = ModelPerformance(
-                timestamp=datetime.now() - timedelta(hours=1),
+                timestamp=perf_timestamp,
                 model_name=model_name,
                 model_type='supervised',
-                precision=random.uniform(0.85, 0.95),
-                recall=random.uniform(0.80, 0.90),
-                f1_score=random.uniform(0.82, 0.93),
-                accuracy=random.uniform(0.88, 0.96),
-                false_positive_rate=random.uniform(0.01, 0.05),
-                roc_auc=random.uniform(0.90, 0.98),
-                pr_auc=random.uniform(0.85, 0.95),
-                latency_ms=random.uniform(2.0, 8.0),
-                memory_usage_mb=random.uniform(100, 500),
-                throughput_packets_per_sec=random.uniform(1000, 5000),
+                precision=float(rng.uniform(0.85, 0.95)),
+                recall=float(rng.uniform(0.80, 0.90)),
+                f1_score=float(rng.uniform(0.82, 0.93)),
+                accuracy=float(rng.uniform(0.88, 0.96)),
+                false_positive_rate=float(rng.uniform(0.01, 0.05)),
+                roc_auc=float(rng.uniform(0.90, 0.98)),
+                pr_auc=float(rng.uniform(0.85, 0.95)),
+                latency_ms=float(rng.uniform(2.0, 8.0)),
+                memory_usage_mb=float(rng.uniform(100, 500)),
+                throughput_packets_per_sec=float(rng.uniform(1000, 5000)),
                 performance_metadata={}
             )
             db.add(perf)
         
         db.commit()
         print("✓ Test data created successfully!")
-        print(f"  - {10} metrics")
-        print(f"  - {15} alerts")
+        print(f"  - {n_metrics} metrics")
+        print(f"  - {n_alerts} alerts")
         print(f"  - {len(models)} model performance records")
         
     except Exception as e:
@@ -1,12 +1,13 @@
 """Merging multiple datasets into a unified format"""
 import pandas as pd
 import numpy as np
+import orjson
+import pyarrow.dataset as ds
 from pathlib import Path
 from typing import List, Optional, Dict
 from app.config import settings
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -67,6 +68,37 @@ class DatasetMerger:
         
         return 'unknown'
     
+    def downcast_numeric(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast 64-bit numeric columns to 32-bit before writing to disk"""
+        float_cols = df.select_dtypes('float64').columns
+        if len(float_cols):
+            df[float_cols] = df[float_cols].astype('float32')
+        
+        # Only narrow integer columns whose values fit in int32
+        int32 = np.iinfo(np.int32)
+        int_cols = [
+            col for col in df.select_dtypes('int64').columns
+            if df[col].empty or (df[col].min() >= int32.min and df[col].max() <= int32.max)
+        ]
+        if int_cols:
+            df[int_cols] = df[int_cols].astype('int32')
+        
+        return df
+    
+    def _read_parquet(self, path: Path, sample_size: Optional[int] = None) -> pd.DataFrame:
+        """Read a parquet file, decoding only the sampled rows when sampling
+        
+        The seeded row sample is taken on the Arrow dataset, so rows that
+        would be discarded are never converted into pandas objects.
+        """
+        dataset = ds.dataset(path, format='parquet')
+        n_rows = dataset.count_rows()
+        if sample_size and n_rows > sample_size:
+            rng = np.random.default_rng(42)
+            indices = np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+            return dataset.take(indices).to_pandas()
+        return dataset.to_table().to_pandas()
+    
     def merge_datasets(
         self,
         dataset_paths: List[Path],
@@ -82,14 +114,17 @@ class DatasetMerger:
                 if path.suffix == '.csv':
                     df = pd.read_csv(path)
                 elif path.suffix == '.parquet':
-                    df = pd.read_parquet(path)
+                    df = self._read_parquet(path, sample_size)
                 else:
                     logger.warning(f"Skipping unsupported file: {path}")
                     continue
                 
-                # Standardize labels if present
+                # Standardize labels if present - once per distinct label,
+                # then broadcast back through the factorized codes
                 if 'label' in df.columns:
-                    df['label'] = df['label'].apply(self.standardize_label)
+                    codes, uniques = pd.factorize(df['label'], use_na_sentinel=False)
+                    standardized = np.array([self.standardize_label(u) for u in uniques], dtype=object)
+                    df['label'] = standardized[codes]
                 
                 # Sample if requested
                 if sample_size and len(df) > sample_size:
@@ -107,31 +142,33 @@ class DatasetMerger:
         common_features = self.find_common_features(datasets)
         logger.info(f"Found {len(common_features)} common features")
         
-        # Align datasets to common features
+        # Numeric features whose dtype differs between datasets would be
+        # upcast during concat; settle them on float32 up front instead
+        mismatched_numeric = [
+            f for f in common_features
+            if all(pd.api.types.is_numeric_dtype(df[f]) for df in datasets)
+            and len({df[f].dtype for df in datasets}) > 1
+        ]
+        
+        # Align datasets to common features (missing columns filled with 0)
         aligned_datasets = []
         for df in datasets:
-            # Select common features
-            available_features = [f for f in common_features if f in df.columns]
-            df_aligned = df[available_features + (['label'] if 'label' in df.columns else [])].copy()
-            
-            # Fill missing features with 0
-            for feature in common_features:
-                if feature not in df_aligned.columns:
-                    df_aligned[feature] = 0
-            
-            # Reorder columns
-            df_aligned = df_aligned[common_features + (['label'] if 'label' in df.columns else [])]
+            cols = common_features + (['label'] if 'label' in df.columns else [])
+            df_aligned = df.reindex(columns=cols, fill_value=0)
+            if mismatched_numeric:
+                df_aligned = df_aligned.astype({f: 'float32' for f in mismatched_numeric})
             aligned_datasets.append(df_aligned)
         
         # Merge datasets
-        merged_df = pd.concat(aligned_datasets, ignore_index=True)
+        merged_df = pd.concat(aligned_datasets, ignore_index=True, copy=False, sort=False)
         logger.info(f"Merged dataset contains {len(merged_df)} records")
         
         # Save merged dataset
         if output_path is None:
             output_path = self.data_path / "merged_dataset.parquet"
         
-        merged_df.to_parquet(output_path, index=False)
+        merged_df = self.downcast_numeric(merged_df)
+        merged_df.to_parquet(output_path, index=False, compression='zstd', use_dictionary=True)
         logger.info(f"Saved merged dataset to {output_path}")
         
         # Save metadata
@@ -143,9 +180,8 @@ class DatasetMerger:
         }
         
         metadata_path = self.data_path / "merged_dataset_metadata.json"
-        import json
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        with open(metadata_path, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS))
         
         return merged_df
     
@@ -153,32 +189,32 @@ class DatasetMerger:
         """Create synthetic network traffic data for testing"""
         logger.info(f"Creating {n_samples} synthetic samples...")
         
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         
-        # Generate synthetic features
+        # Generate synthetic features, one vectorised draw per column
         data = {
-            'src_ip': [f"192.168.1.{np.random.randint(1, 255)}" for _ in range(n_samples)],
-            'dst_ip': [f"10.0.0.{np.random.randint(1, 255)}" for _ in range(n_samples)],
-            'src_port': np.random.randint(1024, 65535, n_samples),
-            'dst_port': np.random.choice([80, 443, 22, 53, 3389], n_samples),
-            'protocol': np.random.choice(['TCP', 'UDP', 'ICMP'], n_samples),
-            'packet_size': np.random.randint(64, 1500, n_samples),
-            'duration': np.random.exponential(1.0, n_samples),
-            'bytes_sent': np.random.randint(0, 10000, n_samples),
-            'bytes_received': np.random.randint(0, 10000, n_samples),
-            'packets_sent': np.random.randint(1, 100, n_samples),
-            'packets_received': np.random.randint(1, 100, n_samples),
+            'src_ip': np.char.add('192.168.1.', rng.integers(1, 255, n_samples).astype(str)),
+            'dst_ip': np.char.add('10.0.0.', rng.integers(1, 255, n_samples).astype(str)),
+            'src_port': rng.integers(1024, 65535, n_samples),
+            'dst_port': rng.choice(np.array([80, 443, 22, 53, 3389]), n_samples),
+            'protocol': rng.choice(np.array(['TCP', 'UDP', 'ICMP']), n_samples),
+            'packet_size': rng.integers(64, 1500, n_samples),
+            'duration': rng.exponential(1.0, n_samples),
+            'bytes_sent': rng.integers(0, 10000, n_samples),
+            'bytes_received': rng.integers(0, 10000, n_samples),
+            'packets_sent': rng.integers(1, 100, n_samples),
+            'packets_received': rng.integers(1, 100, n_samples),
         }
         
-        df = pd.DataFrame(data)
+        df = pd.DataFrame(data, copy=False)
         
         # Generate labels (mostly normal, some attacks)
-        labels = ['normal'] * int(n_samples * 0.8)
-        labels += ['dos'] * int(n_samples * 0.1)
-        labels += ['probe'] * int(n_samples * 0.05)
-        labels += ['r2l'] * int(n_samples * 0.05)
-        np.random.shuffle(labels)
-        df['label'] = labels[:n_samples]
+        n_dos = int(n_samples * 0.1)
+        n_probe = int(n_samples * 0.05)
+        n_r2l = int(n_samples * 0.05)
+        n_normal = n_samples - n_dos - n_probe - n_r2l
+        labels = np.repeat(['normal', 'dos', 'probe', 'r2l'], [n_normal, n_dos, n_probe, n_r2l])
+        df['label'] = rng.permutation(labels)
         
         return df
 
@@ -193,9 +229,9 @@ def main():
     
     if not dataset_files:
         logger.warning("No processed datasets found. Creating synthetic data for testing...")
-        synthetic_df = merger.create_synthetic_data(n_samples=5000)
+        synthetic_df = merger.downcast_numeric(merger.create_synthetic_data(n_samples=5000))
         synthetic_path = processed_path / "synthetic_transformed.parquet"
-        synthetic_df.to_parquet(synthetic_path, index=False)
+        synthetic_df.to_parquet(synthetic_path, index=False, compression='zstd', use_dictionary=True)
         dataset_files = [synthetic_path]
     
     # Merge datasets
@@ -206,5 +242,6 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
 
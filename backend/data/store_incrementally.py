@@ -1,13 +1,13 @@
 """Incremental data storage for online learning"""
 import pandas as pd
+import orjson
 import sqlite3
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from app.config import settings
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -50,10 +50,14 @@ class IncrementalStorage:
             )
         """)
         
-        # Create index
+        # Create indexes
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_timestamp ON packets(timestamp)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_packets_label_id ON packets(label, id)
+            WHERE label IS NOT NULL
+        """)
         
         self.conn.commit()
         logger.info("Initialized incremental storage tables")
@@ -68,7 +72,7 @@ class IncrementalStorage:
             INSERT INTO packets (features, label, prediction, confidence)
             VALUES (?, ?, ?, ?)
         """, (
-            str(features),
+            orjson.dumps(features, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode(),
             label,
             prediction,
             confidence
@@ -118,19 +122,23 @@ class IncrementalStorage:
         df = pd.read_sql_query(query, self.conn, params=params)
         return df
     
-    def get_labeled_data(self, min_samples: int = 100) -> pd.DataFrame:
-        """Get labeled data for supervised learning"""
+    def get_labeled_data(self, batch_size: int = 1000, after_id: int = 0) -> Tuple[pd.DataFrame, int]:
+        """Get a page of labeled data for supervised learning
+        
+        Pages are keyed on packet id, so pass the returned id back as
+        ``after_id`` to resume from where the previous batch stopped.
+        """
         query = """
-            SELECT p.*, GROUP_CONCAT(f.feature_name || ':' || f.feature_value) as feature_string
-            FROM packets p
-            LEFT JOIN features f ON p.id = f.packet_id
-            WHERE p.label IS NOT NULL
-            GROUP BY p.id
+            SELECT id, features, label
+            FROM packets
+            WHERE label IS NOT NULL AND id > ?
+            ORDER BY id
             LIMIT ?
         """
         
-        df = pd.read_sql_query(query, self.conn, params=[min_samples * 10])
-        return df
+        df = pd.read_sql_query(query, self.conn, params=[after_id, batch_size])
+        last_id = int(df['id'].max()) if not df.empty else after_id
+        return df, last_id
     
     def mark_verified(self, packet_id: int, verified: bool = True):
         """Mark a packet as verified"""
@@ -214,5 +222,6 @@ def main():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
 
@@ -1,13 +1,15 @@
 """Feature extraction and transformation pipeline"""
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from app.config import settings
 import logging
 import json
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -50,45 +52,92 @@ class FeatureExtractor:
         if not packet_window:
             return {}
         
-        sizes = [p.get('packet_size', 0) for p in packet_window]
-        ports = [p.get('dst_port', 0) for p in packet_window if p.get('dst_port')]
+        # float64 keeps fractional sizes; NaN ports (records built from a
+        # DataFrame) are dropped before counting distinct ports
+        sizes = np.fromiter(
+            (p.get('packet_size', 0) for p in packet_window),
+            dtype=np.float64,
+            count=len(packet_window)
+        )
+        ports = np.fromiter(
+            (p['dst_port'] for p in packet_window if p.get('dst_port')),
+            dtype=np.float64
+        )
+        ports = ports[~np.isnan(ports)]
+        
+        # Reuse the mean for the variance instead of a separate np.std pass
+        mean = sizes.mean()
+        std = np.sqrt(np.square(sizes - mean).mean())
         
         features = {
-            'mean_packet_size': np.mean(sizes) if sizes else 0,
-            'std_packet_size': np.std(sizes) if sizes else 0,
-            'min_packet_size': np.min(sizes) if sizes else 0,
-            'max_packet_size': np.max(sizes) if sizes else 0,
+            'mean_packet_size': float(mean),
+            'std_packet_size': float(std),
+            'min_packet_size': float(sizes.min()),
+            'max_packet_size': float(sizes.max()),
             'packet_count': len(packet_window),
-            'unique_dst_ports': len(set(ports)) if ports else 0,
+            'unique_dst_ports': int(np.unique(ports).size),
         }
         
         return features
     
-    def extract_flow_features(self, flow_data: List[Dict]) -> Dict:
-        """Extract flow-based features"""
-        if not flow_data:
+    def extract_flow_features(self, flow_data) -> Dict:
+        """Extract flow-based features
+        
+        Accepts either a list of packet dicts or a DataFrame slice with
+        ``packet_size``/``timestamp`` columns.
+        """
+        if flow_data is None or len(flow_data) == 0:
             return {}
         
+        if isinstance(flow_data, pd.DataFrame):
+            sizes = flow_data['packet_size'] if 'packet_size' in flow_data.columns else pd.Series(dtype=float)
+            raw_timestamps = flow_data['timestamp'] if 'timestamp' in flow_data.columns else []
+            total_bytes = sizes.sum()
+        else:
+            total_bytes = sum(p.get('packet_size', 0) for p in flow_data)
+            raw_timestamps = [p['timestamp'] for p in flow_data if 'timestamp' in p]
+        
         features = {
             'flow_duration': 0,
             'total_packets': len(flow_data),
-            'total_bytes': sum(p.get('packet_size', 0) for p in flow_data),
+            'total_bytes': total_bytes,
             'packets_per_second': 0,
             'bytes_per_second': 0,
         }
         
-        if len(flow_data) > 1:
-            timestamps = [pd.to_datetime(p.get('timestamp', 0)) for p in flow_data if 'timestamp' in p]
-            if timestamps:
-                duration = (max(timestamps) - min(timestamps)).total_seconds()
-                if duration > 0:
-                    features['flow_duration'] = duration
-                    features['packets_per_second'] = len(flow_data) / duration
-                    features['bytes_per_second'] = features['total_bytes'] / duration
+        if len(flow_data) > 1 and len(raw_timestamps):
+            # Parse the whole flow in one call rather than per packet
+            timestamps = pd.DatetimeIndex(pd.to_datetime(raw_timestamps, utc=True))
+            duration = (timestamps.max() - timestamps.min()).total_seconds()
+            if duration > 0:
+                features['flow_duration'] = duration
+                features['packets_per_second'] = len(flow_data) / duration
+                features['bytes_per_second'] = features['total_bytes'] / duration
         
         return features
 
 
+class InlineScaler:
+    """Standardise columns in place; exposes StandardScaler's ``mean_``/``scale_``"""
+    
+    def fit_transform(self, mat: np.ndarray) -> np.ndarray:
+        """Fit column mean/std on a float matrix and normalise it in place
+        
+        Missing values are ignored when fitting and stay NaN, as with
+        StandardScaler.
+        """
+        self.mean_ = np.nanmean(mat, axis=0)
+        self.scale_ = np.nanstd(mat, axis=0)
+        self.scale_[self.scale_ == 0] = 1.0
+        return self.transform(mat)
+    
+    def transform(self, mat: np.ndarray) -> np.ndarray:
+        """Normalise a float matrix in place with the fitted statistics"""
+        np.subtract(mat, self.mean_, out=mat)
+        np.divide(mat, self.scale_, out=mat)
+        return mat
+
+
 class DataTransformer:
     """Transform raw data into ML-ready format"""
     
@@ -97,67 +146,242 @@ class DataTransformer:
         self.processed_path = Path(settings.PROCESSED_DATA_PATH)
         self.processed_path.mkdir(parents=True, exist_ok=True)
     
-    def normalize_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Normalize numerical features"""
-        from sklearn.preprocessing import StandardScaler, LabelEncoder
+    def normalize_features(self, df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+        """Normalize numerical features
         
-        df_normalized = df.copy()
+        With ``inplace`` the encoded columns are written back into ``df``;
+        otherwise a new frame is assembled from the encoded arrays and the
+        untouched input columns, so the input is never deep-copied.
+        """
+        new_columns = {}
         
-        # Encode categorical features
+        # Encode categorical features as dictionary codes; the sorted
+        # categories play the role of LabelEncoder.classes_
         label_encoders = {}
         categorical_cols = ['protocol', 'src_ip', 'dst_ip']
         
         for col in categorical_cols:
-            if col in df_normalized.columns:
-                le = LabelEncoder()
-                df_normalized[col] = le.fit_transform(df_normalized[col].astype(str))
-                label_encoders[col] = le
+            if col in df.columns:
+                values = df[col]
+                if values.dtype == object:
+                    # Mixed object columns need a common type to be sortable
+                    values = values.astype(str)
+                cat = pd.Categorical(values)
+                new_columns[col] = cat.codes.astype(np.int32)
+                label_encoders[col] = cat.categories.to_numpy()
         
-        # Normalize numerical features
-        numerical_cols = df_normalized.select_dtypes(include=[np.number]).columns.tolist()
-        if 'label' in numerical_cols:
-            numerical_cols.remove('label')
+        # Normalize numerical features (encoded categoricals included)
+        numerical_cols = [
+            col for col in df.columns
+            if col != 'label' and (col in new_columns or pd.api.types.is_numeric_dtype(df[col]))
+        ]
         
-        scaler = StandardScaler()
+        scaler = InlineScaler()
         if numerical_cols:
-            df_normalized[numerical_cols] = scaler.fit_transform(df_normalized[numerical_cols])
+            # Column-major so each scaled column below is a contiguous view
+            mat = np.empty((len(df), len(numerical_cols)), dtype=np.float32, order='F')
+            for j, col in enumerate(numerical_cols):
+                mat[:, j] = new_columns[col] if col in new_columns else df[col].to_numpy()
+            scaler.fit_transform(mat)
+            for j, col in enumerate(numerical_cols):
+                new_columns[col] = mat[:, j]
+        
+        if inplace:
+            for col, values in new_columns.items():
+                df[col] = values
+            return df, scaler, label_encoders
         
+        df_normalized = pd.DataFrame(
+            {col: new_columns.get(col, df[col]) for col in df.columns},
+            index=df.index,
+            copy=False
+        )
         return df_normalized, scaler, label_encoders
     
-    def transform_dataset(self, input_path: Path, output_path: Optional[Path] = None) -> pd.DataFrame:
-        """Transform a dataset file"""
-        logger.info(f"Transforming dataset: {input_path}")
-        
-        # Load data
+    def _iter_chunks(self, input_path: Path, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """Yield a dataset file as DataFrame chunks without loading it whole"""
         if input_path.suffix == '.csv':
-            df = pd.read_csv(input_path)
+            # Arrow's multithreaded CSV reader; pandas' pyarrow engine has no
+            # chunksize, so the streamed blocks are regrouped into chunks here
+            reader = pa_csv.open_csv(input_path)
+            pending, pending_rows = [], 0
+            for batch in reader:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                while pending_rows >= chunk_size:
+                    table = pa.Table.from_batches(pending, schema=reader.schema)
+                    yield table.slice(0, chunk_size).to_pandas()
+                    rest = table.slice(chunk_size)
+                    pending, pending_rows = rest.to_batches(), rest.num_rows
+            if pending_rows:
+                yield pa.Table.from_batches(pending, schema=reader.schema).to_pandas()
         elif input_path.suffix == '.parquet':
-            df = pd.read_parquet(input_path)
+            for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
         else:
             raise ValueError(f"Unsupported file format: {input_path.suffix}")
+    
+    def _fit_streaming(self, input_path: Path, chunk_size: int) -> Tuple[InlineScaler, Dict, List[str], int]:
+        """Fit the scaler and category mappings in one pass over the chunks
+        
+        Produces the same encoding as normalize_features (used for files that
+        fit in one chunk): categorical columns get sorted-category codes and
+        are standardised together with the numeric columns.
+        """
+        categorical_cols = ['protocol', 'src_ip', 'dst_ip']
+        scaled_cols = None
+        sums = sum_sq = valid_counts = None
+        category_counts = {}
+        null_counts = {}
+        n_rows = 0
         
-        logger.info(f"Loaded {len(df)} records")
+        for chunk in self._iter_chunks(input_path, chunk_size):
+            if scaled_cols is None:
+                category_counts = {
+                    col: pd.Series(dtype=np.int64) for col in categorical_cols if col in chunk.columns
+                }
+                null_counts = dict.fromkeys(category_counts, 0)
+                scaled_cols = [
+                    col for col in chunk.columns
+                    if col != 'label' and (col in category_counts or pd.api.types.is_numeric_dtype(chunk[col]))
+                ]
+                numeric_cols = [col for col in scaled_cols if col not in category_counts]
+                sums = np.zeros(len(numeric_cols))
+                sum_sq = np.zeros(len(numeric_cols))
+                valid_counts = np.zeros(len(numeric_cols), dtype=np.int64)
+            
+            # Missing values are left out of the statistics, as StandardScaler does
+            mat = chunk[numeric_cols].to_numpy(dtype=np.float64)
+            sums += np.nansum(mat, axis=0)
+            sum_sq += np.nansum(np.square(mat), axis=0)
+            valid_counts += np.count_nonzero(~np.isnan(mat), axis=0)
+            
+            for col in category_counts:
+                values = chunk[col]
+                if values.dtype == object:
+                    values = values.astype(str)
+                category_counts[col] = category_counts[col].add(values.value_counts(), fill_value=0)
+                null_counts[col] += int(values.isna().sum())
+            
+            n_rows += len(chunk)
+        
+        if not n_rows:
+            raise ValueError(f"No records in {input_path}")
+        
+        # Code statistics follow from the category counts (missing values get code -1)
+        encoders = {}
+        col_sum = dict(zip(numeric_cols, sums))
+        col_sum_sq = dict(zip(numeric_cols, sum_sq))
+        col_count = dict(zip(numeric_cols, valid_counts))
+        for col, counts in category_counts.items():
+            counts = counts.sort_index()
+            encoders[col] = counts.index.to_numpy()
+            codes = np.arange(len(counts))
+            col_sum[col] = (codes * counts.to_numpy()).sum() - null_counts[col]
+            col_sum_sq[col] = (np.square(codes) * counts.to_numpy()).sum() + null_counts[col]
+            col_count[col] = n_rows
+        
+        scaler = InlineScaler()
+        # An all-missing column gets mean 0 / scale 1 instead of NaN
+        n_valid = np.maximum([col_count[col] for col in scaled_cols], 1)
+        mean = np.array([col_sum[col] for col in scaled_cols]) / n_valid
+        variance = np.array([col_sum_sq[col] for col in scaled_cols]) / n_valid - np.square(mean)
+        scaler.mean_ = mean.astype(np.float32)
+        scaler.scale_ = np.sqrt(np.maximum(variance, 0)).astype(np.float32)
+        scaler.scale_[scaler.scale_ == 0] = 1.0
         
-        # Normalize features
-        df_normalized, scaler, encoders = self.normalize_features(df)
+        return scaler, encoders, scaled_cols, n_rows
+    
+    def _write_streaming(self, input_path: Path, output_path: Path, chunk_size: int,
+                         scaler: InlineScaler, encoders: Dict, scaled_cols: List[str]):
+        """Encode, scale and append each chunk to the output parquet file"""
+        writer = None
+        try:
+            for chunk in self._iter_chunks(input_path, chunk_size):
+                for col, categories in encoders.items():
+                    values = chunk[col]
+                    if values.dtype == object:
+                        values = values.astype(str)
+                    chunk[col] = pd.Categorical(values, categories=categories).codes.astype(np.int32)
+                
+                if scaled_cols:
+                    mat = chunk[scaled_cols].to_numpy(dtype=np.float32, copy=True)
+                    chunk[scaled_cols] = scaler.transform(mat)
+                
+                # Later chunks are cast to the first chunk's schema
+                table = pa.Table.from_pandas(
+                    chunk, schema=writer.schema if writer else None, preserve_index=False
+                )
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    def transform_dataset(self, input_path: Path, output_path: Optional[Path] = None,
+                          chunk_size: int = 100_000) -> Path:
+        """Transform a dataset file
+        
+        A file that fits in one chunk of ``chunk_size`` rows is read once and
+        normalised in memory. Larger files are streamed twice in chunks: once
+        to fit the scaler and category mappings, and once to encode, scale and
+        append each chunk to the output parquet file, so peak memory is bounded
+        by the chunk size rather than the dataset size.
+        """
+        logger.info(f"Transforming dataset: {input_path}")
         
         # Save transformed data
         if output_path is None:
             output_path = self.processed_path / f"{input_path.stem}_transformed.parquet"
         
-        df_normalized.to_parquet(output_path, index=False)
+        chunks = self._iter_chunks(input_path, chunk_size)
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
+            raise ValueError(f"No records in {input_path}")
+        if next(chunks, None) is None:
+            # The loaded frame is ours, so normalise it without a copy
+            df_normalized, scaler, encoders = self.normalize_features(first_chunk, inplace=True)
+            logger.info(f"Loaded {len(df_normalized)} records")
+            df_normalized.to_parquet(output_path, index=False)
+        else:
+            chunks.close()
+            scaler, encoders, scaled_cols, n_rows = self._fit_streaming(input_path, chunk_size)
+            logger.info(f"Fitted preprocessors on {n_rows} records")
+            self._write_streaming(input_path, output_path, chunk_size, scaler, encoders, scaled_cols)
         logger.info(f"Saved transformed data to {output_path}")
         
         # Save preprocessors
         preprocessor_path = self.processed_path / f"{input_path.stem}_preprocessors.json"
         preprocessors = {
-            'scaler_mean': scaler.mean_.tolist() if hasattr(scaler, 'mean_') else [],
-            'scaler_scale': scaler.scale_.tolist() if hasattr(scaler, 'scale_') else [],
+            'scaler_mean': scaler.mean_.tolist(),
+            'scaler_scale': scaler.scale_.tolist(),
+            'categories': {col: categories.tolist() for col, categories in encoders.items()},
         }
         with open(preprocessor_path, 'w') as f:
             json.dump(preprocessors, f)
         
-        return df_normalized
+        return output_path
+    
+    def _fingerprint(self, input_path: Path) -> str:
+        """Cheap change marker for an input file (mtime + size, no content read)"""
+        stat = input_path.stat()
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+    
+    def _hash_path(self, input_path: Path) -> Path:
+        return self.processed_path / f"{input_path.stem}.hash"
+    
+    def is_up_to_date(self, input_path: Path) -> bool:
+        """True if the input was already transformed and has not changed since"""
+        output_path = self.processed_path / f"{input_path.stem}_transformed.parquet"
+        hash_path = self._hash_path(input_path)
+        if not (output_path.exists() and hash_path.exists()):
+            return False
+        return hash_path.read_text().strip() == self._fingerprint(input_path)
+    
+    def mark_transformed(self, input_path: Path):
+        """Record the input fingerprint next to the transformed output"""
+        self._hash_path(input_path).write_text(self._fingerprint(input_path))
     
     def create_feature_metadata(self, df: pd.DataFrame) -> Dict:
         """Create metadata for features"""
@@ -167,15 +391,20 @@ class DataTransformer:
             'label_types': {}
         }
         
+        # One reduction per statistic across all columns instead of per column
+        num_stats = df.select_dtypes(include=[np.number, 'bool']).agg(['min', 'max', 'mean'])
+        null_counts = df.isna().sum()
+        
         for col in df.columns:
             if col != 'label':
+                is_numeric = col in num_stats.columns
                 feature_info = {
                     'name': col,
                     'type': str(df[col].dtype),
-                    'min': float(df[col].min()) if pd.api.types.is_numeric_dtype(df[col]) else None,
-                    'max': float(df[col].max()) if pd.api.types.is_numeric_dtype(df[col]) else None,
-                    'mean': float(df[col].mean()) if pd.api.types.is_numeric_dtype(df[col]) else None,
-                    'null_count': int(df[col].isnull().sum())
+                    'min': float(num_stats.at['min', col]) if is_numeric else None,
+                    'max': float(num_stats.at['max', col]) if is_numeric else None,
+                    'mean': float(num_stats.at['mean', col]) if is_numeric else None,
+                    'null_count': int(null_counts[col])
                 }
                 metadata['features'].append(feature_info)
                 metadata['description'][col] = f"Feature: {col}"
@@ -197,12 +426,17 @@ def main():
     # Transform datasets
     raw_path = Path(settings.RAW_DATA_PATH)
     for dataset_file in raw_path.rglob("*.csv"):
+        if transformer.is_up_to_date(dataset_file):
+            logger.info(f"Skipping unchanged dataset: {dataset_file}")
+            continue
         try:
             transformer.transform_dataset(dataset_file)
+            transformer.mark_transformed(dataset_file)
         except Exception as e:
             logger.error(f"Error transforming {dataset_file}: {e}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     main()
 
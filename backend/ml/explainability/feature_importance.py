@@ -3,17 +3,57 @@ import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
 from sklearn.inspection import permutation_importance
+from joblib import Memory, Parallel, cpu_count, delayed, effective_n_jobs
 import logging
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Hyper-threads add workers (and copies of X) without adding throughput
+PHYSICAL_CORES = cpu_count(only_physical_cores=True)
+
+
+def _rank(importances: np.ndarray) -> np.ndarray:
+    """Indices of the features by descending importance (stable on ties)"""
+    return np.argsort(-np.asarray(importances, dtype=np.float64), kind='stable')
+
+
+def _permutation_importance(model, X: np.ndarray, y: np.ndarray, n_repeats: int,
+                            random_state: int, n_jobs: int):
+    """Permutation importance means/stds; memoised on disk by FeatureImportanceAnalyzer"""
+    result = permutation_importance(
+        model,
+        X,
+        y,
+        n_repeats=n_repeats,
+        random_state=random_state,
+        n_jobs=n_jobs
+    )
+    return result.importances_mean, result.importances_std
+
+
+def _score_feature_chunk(model, X: np.ndarray, y: np.ndarray, columns: List[int], perms: List[np.ndarray]) -> np.ndarray:
+    """Score a model with each column in `columns` shuffled by every permutation"""
+    # One scratch copy per task; each column is restored after it is scored
+    X_scratch = X.copy()
+    scores = np.empty((len(columns), len(perms)), dtype=np.float64)
+    for i, j in enumerate(columns):
+        for r, perm in enumerate(perms):
+            X_scratch[:, j] = X[perm, j]
+            scores[i, r] = model.score(X_scratch, y)
+        X_scratch[:, j] = X[:, j]
+    return scores
+
 
 class FeatureImportanceAnalyzer:
     """Analyze feature importance using permutation importance"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = None):
         self.importance_cache = {}
+        self.baseline_scores = {}
+        # Results persist across restarts when a cache_dir is given; joblib
+        # keys them on the hashed model, data and parameters
+        self._memory = Memory(location=cache_dir, verbose=0)
+        self._permutation_importance = self._memory.cache(_permutation_importance, ignore=['n_jobs'])
     
     def calculate_permutation_importance(
         self,
@@ -35,54 +75,36 @@ class FeatureImportanceAnalyzer:
                 
                 # If model has feature_importances_ attribute
                 if hasattr(model, 'feature_importances_'):
-                    importances = model.feature_importances_
+                    importances = np.asarray(model.feature_importances_)
                     feature_names = feature_names or [f'feature_{i}' for i in range(len(importances))]
                     
-                    importance_dict = {
-                        name: float(imp) for name, imp in zip(feature_names, importances)
+                    # Build the dict directly in importance order
+                    sorted_importance = {
+                        feature_names[i]: float(importances[i]) for i in _rank(importances[:len(feature_names)])
                     }
-                    
-                    # Sort by importance
-                    sorted_importance = dict(sorted(importance_dict.items(), key=lambda x: x[1], reverse=True))
                     self.importance_cache[model_name] = sorted_importance
                     return sorted_importance
                 
                 return {}
             
-            # Calculate permutation importance
-            perm_importance = permutation_importance(
-                model,
-                X,
-                y,
-                n_repeats=n_repeats,
-                random_state=random_state,
-                n_jobs=-1
+            # Calculate permutation importance (or load it from the disk cache)
+            means, stds = self._permutation_importance(
+                model, X, y, n_repeats, random_state, PHYSICAL_CORES
             )
             
             # Create feature names if not provided
             if feature_names is None:
                 feature_names = [f'feature_{i}' for i in range(X.shape[1])]
             
-            # Create importance dictionary
-            importance_dict = {
-                name: {
-                    'importance_mean': float(mean),
-                    'importance_std': float(std)
+            # Create importance dictionary, sorted by importance
+            sorted_importance = {
+                feature_names[i]: {
+                    'importance_mean': float(means[i]),
+                    'importance_std': float(stds[i])
                 }
-                for name, mean, std in zip(
-                    feature_names,
-                    perm_importance.importances_mean,
-                    perm_importance.importances_std
-                )
+                for i in _rank(means[:len(feature_names)])
             }
             
-            # Sort by importance
-            sorted_importance = dict(sorted(
-                importance_dict.items(),
-                key=lambda x: x[1]['importance_mean'],
-                reverse=True
-            ))
-            
             # Cache result
             self.importance_cache[model_name] = sorted_importance
             
@@ -91,6 +113,67 @@ class FeatureImportanceAnalyzer:
             logger.error(f"Error calculating permutation importance: {e}")
             return {}
     
+    def calculate_permutation_importance_multi(
+        self,
+        models: Dict,
+        X: np.ndarray,
+        y: np.ndarray,
+        feature_names: Optional[List[str]] = None,
+        n_repeats: int = 10,
+        random_state: int = 42,
+        n_jobs: int = PHYSICAL_CORES
+    ) -> Dict[str, Dict]:
+        """Calculate permutation importance for several models over the same data
+        
+        The shuffles are drawn once and shared by every model, and each model's
+        baseline score is computed only once.
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        n_features = X.shape[1]
+        if n_features == 0:
+            return {model_name: {} for model_name in models}
+        if feature_names is None:
+            feature_names = [f'feature_{i}' for i in range(n_features)]
+        
+        rng = np.random.default_rng(random_state)
+        perms = [rng.permutation(len(X)) for _ in range(n_repeats)]
+        
+        # Split the feature loop into one chunk per worker
+        n_chunks = min(n_features, effective_n_jobs(n_jobs))
+        chunks = [c.tolist() for c in np.array_split(np.arange(n_features), n_chunks)]
+        
+        results = {}
+        # Large X is memory-mapped read-only and shared by the workers
+        with Parallel(n_jobs=n_jobs, backend='loky', max_nbytes='1M', mmap_mode='r') as parallel:
+            for model_name, model in models.items():
+                try:
+                    baseline = model.score(X, y)
+                    self.baseline_scores[model_name] = float(baseline)
+                    
+                    chunk_scores = parallel(
+                        delayed(_score_feature_chunk)(model, X, y, cols, perms) for cols in chunks
+                    )
+                    importances = baseline - np.vstack(chunk_scores)
+                    means = importances.mean(axis=1)
+                    stds = importances.std(axis=1)
+                    
+                    sorted_importance = {
+                        feature_names[i]: {
+                            'importance_mean': float(means[i]),
+                            'importance_std': float(stds[i])
+                        }
+                        for i in _rank(means[:len(feature_names)])
+                    }
+                    
+                    self.importance_cache[model_name] = sorted_importance
+                    results[model_name] = sorted_importance
+                except Exception as e:
+                    logger.error(f"Error calculating permutation importance for {model_name}: {e}")
+                    results[model_name] = {}
+        
+        return results
+    
     def get_top_features(self, importance_dict: Dict, top_n: int = 10) -> List[Dict]:
         """Get top N important features"""
         items = list(importance_dict.items())[:top_n]
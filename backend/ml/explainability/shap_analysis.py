@@ -4,22 +4,55 @@ import pandas as pd
 from typing import Dict, List, Optional
 import logging
 
+logger = logging.getLogger(__name__)
+
+# Rows used for SHAP analysis and how many sampled index sets to remember
+SHAP_SAMPLE_SIZE = 1000
+SAMPLE_CACHE_SIZE = 16
+
 try:
     import shap
     SHAP_AVAILABLE = True
 except ImportError:
     SHAP_AVAILABLE = False
-    logging.warning("SHAP library not available")
-
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+    logger.warning("SHAP library not available")
 
 
 class SHAPAnalyzer:
     """SHAP value analysis for model explainability"""
     
     def __init__(self):
+        # (id(model), model_type) -> {'model', 'explainer', 'background'}
         self.explainers = {}
+        # (data pointer, shape) -> sampled row indices
+        self._sample_cache = {}
+    
+    def get_explainer(self, model, X_sample: np.ndarray, model_type: str = 'tree'):
+        """Return the cached explainer for a model, building it on first use
+        
+        Tree explainers depend only on the model. Linear/Kernel explainers are
+        also defined by their background set, so they are reused only when
+        X_sample matches the background they were built from.
+        """
+        key = (id(model), model_type)
+        cached = self.explainers.get(key)
+        # id() can be reused once a model is garbage collected
+        if cached is not None and cached['model'] is model and (
+            cached['background'] is None
+            or (cached['background'].shape == X_sample.shape
+                and np.array_equal(cached['background'], X_sample))
+        ):
+            return cached['explainer']
+        
+        explainer = self.create_explainer(model, X_sample, model_type)
+        if explainer is not None:
+            self.explainers[key] = {
+                'model': model,
+                'explainer': explainer,
+                # Linear/Kernel explainers are defined by their background set
+                'background': None if model_type == 'tree' else X_sample,
+            }
+        return explainer
     
     def create_explainer(self, model, X_sample: np.ndarray, model_type: str = 'tree'):
         """Create SHAP explainer for a model"""
@@ -57,15 +90,14 @@ class SHAPAnalyzer:
         
         try:
             # Sample data if too large
-            if len(X) > 1000:
-                logger.info("Sampling data for SHAP analysis")
-                indices = np.random.choice(len(X), size=1000, replace=False)
-                X_sample = X[indices]
+            X = np.asarray(X)
+            if len(X) > SHAP_SAMPLE_SIZE:
+                X_sample = X[self._sample_indices(X)]
             else:
                 X_sample = X
             
-            # Create explainer
-            explainer = self.create_explainer(model, X_sample, model_type)
+            # Reuse the explainer built for this model on earlier calls
+            explainer = self.get_explainer(model, X_sample, model_type)
             if explainer is None:
                 return {
                     'shap_values': None,
@@ -74,17 +106,20 @@ class SHAPAnalyzer:
                 }
             
             # Calculate SHAP values
-            shap_values = explainer.shap_values(X_sample)
+            if model_type == 'tree':
+                explanation = explainer(X_sample, check_additivity=False)
+            else:
+                explanation = explainer(X_sample)
+            shap_values = explanation.values
             
-            # Handle different output formats
-            if isinstance(shap_values, list):
-                # Multi-class output
-                shap_values = shap_values[1]  # Use positive class
+            # Multi-output explanations are (samples, features, classes)
+            if shap_values.ndim == 3:
+                shap_values = shap_values[..., 1]  # Use positive class
             
             return {
-                'shap_values': shap_values.tolist() if isinstance(shap_values, np.ndarray) else shap_values,
+                'shap_values': shap_values.tolist(),
                 'feature_names': feature_names or [f'feature_{i}' for i in range(X.shape[1])],
-                'base_value': float(explainer.expected_value) if hasattr(explainer, 'expected_value') else None
+                'base_value': self._base_value(explainer)
             }
         except Exception as e:
             logger.error(f"Error calculating SHAP values: {e}")
@@ -94,21 +129,44 @@ class SHAPAnalyzer:
                 'error': str(e)
             }
     
+    def _sample_indices(self, X: np.ndarray) -> np.ndarray:
+        """Row sample for X, drawn once per array and reused on later calls"""
+        key = (X.__array_interface__['data'][0], X.shape)
+        indices = self._sample_cache.get(key)
+        if indices is None:
+            logger.info("Sampling data for SHAP analysis")
+            indices = np.random.default_rng(42).choice(
+                len(X), size=SHAP_SAMPLE_SIZE, replace=False, shuffle=False
+            )
+            if len(self._sample_cache) >= SAMPLE_CACHE_SIZE:
+                # Drop the oldest entry
+                self._sample_cache.pop(next(iter(self._sample_cache)))
+            self._sample_cache[key] = indices
+        return indices
+    
+    @staticmethod
+    def _base_value(explainer) -> Optional[float]:
+        """Expected model output, taking the positive class for classifiers"""
+        if not hasattr(explainer, 'expected_value'):
+            return None
+        expected = np.atleast_1d(explainer.expected_value)
+        return float(expected[1] if expected.size > 1 else expected[0])
+    
     def get_feature_importance_from_shap(self, shap_values: np.ndarray, feature_names: List[str]) -> Dict:
         """Get feature importance from SHAP values"""
         if shap_values is None:
             return {}
         
-        # Calculate mean absolute SHAP values
-        mean_shap = np.abs(shap_values).mean(axis=0)
+        # calculate_shap_values returns nested lists; convert them once to a
+        # contiguous float32 array (a no-op for arrays that already are)
+        shap_values = np.ascontiguousarray(shap_values, dtype=np.float32)
         
-        # Create feature importance dictionary
-        importance = {
-            name: float(value) for name, value in zip(feature_names, mean_shap)
-        }
+        # Calculate mean absolute SHAP values (accumulated in float64)
+        mean_shap = np.abs(shap_values).mean(axis=0, dtype=np.float64)
         
-        # Sort by importance
-        sorted_importance = dict(sorted(importance.items(), key=lambda x: x[1], reverse=True))
+        # Build the dict directly in importance order
+        order = np.argsort(-mean_shap[:len(feature_names)], kind='stable')
+        sorted_importance = {feature_names[i]: float(mean_shap[i]) for i in order}
         
         return sorted_importance
 
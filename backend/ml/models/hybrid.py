@@ -16,6 +16,15 @@ from backend.ml.models.unsupervised import UnsupervisedModelTrainer
 
 logger = logging.getLogger(__name__)
 
+# Indexed by the path codes returned from HybridDetector._fuse_decisions_batch
+DECISION_PATHS = np.array([
+    "signature_high_confidence",
+    "signature_ml_agreement",
+    "signature_ml_conflict",
+    "ml_high_confidence",
+    "ml_low_confidence",
+])
+
 
 class HybridDetector:
     """
@@ -75,15 +84,24 @@ class HybridDetector:
         self.unsupervised_model = unsupervised_model
         self.preprocessor = preprocessor
     
-    def detect(self, row: pd.Series, X_processed: Optional[np.ndarray] = None) -> Dict:
+    def detect(self, row: pd.Series, X_processed: Optional[np.ndarray] = None,
+               signature: Optional[Tuple[bool, float, str]] = None) -> Dict:
         """
         Detect intrusion using hybrid approach
         
+        Args:
+            row: Packet data
+            X_processed: Preprocessed feature vector for the ML models
+            signature: Precomputed (is_attack, confidence, name) signature
+                result, e.g. from SignatureDetector.check_signatures_batch
+        
         Returns:
             Dictionary with detection results
         """
         # Step 1: Signature-based detection
-        sig_attack, sig_confidence, sig_name = self.signature_detector.detect(row)
+        if signature is None:
+            signature = self.signature_detector.detect(row)
+        sig_attack, sig_confidence, sig_name = signature
         
         # Step 2: ML-based detection (if features available)
         ml_attack = False
@@ -92,32 +110,9 @@ class HybridDetector:
         unsupervised_pred = 0
         
         if X_processed is not None and self.supervised_model is not None and self.unsupervised_model is not None:
-            # Supervised prediction
-            try:
-                supervised_proba = self.supervised_model.predict_proba(X_processed.reshape(1, -1))[0]
-                supervised_pred = self.supervised_model.predict(X_processed.reshape(1, -1))[0]
-                supervised_confidence = supervised_proba[1] if len(supervised_proba) > 1 else supervised_proba[0]
-            except:
-                supervised_pred = 0
-                supervised_confidence = 0.0
-            
-            # Unsupervised prediction
-            try:
-                unsupervised_pred = self.unsupervised_model.predict_anomaly(
-                    self.unsupervised_model_name, 
-                    X_processed.reshape(1, -1)
-                )[0]
-                # Get anomaly score for confidence
-                if self.unsupervised_model_name == 'isolation_forest':
-                    score = -self.unsupervised_model.models[self.unsupervised_model_name].decision_function(
-                        X_processed.reshape(1, -1)
-                    )[0]
-                    unsupervised_confidence = min(1.0, max(0.0, (score - 0) / 2))  # Normalize
-                else:
-                    unsupervised_confidence = 0.7 if unsupervised_pred == 1 else 0.3
-            except:
-                unsupervised_pred = 0
-                unsupervised_confidence = 0.0
+            X_processed = np.asarray(X_processed, dtype=np.float32)
+            supervised_pred, supervised_confidence, unsupervised_pred, unsupervised_confidence = \
+                self._score_ml(X_processed)
             
             # Combine ML predictions
             ml_confidence = (
@@ -159,6 +154,73 @@ class HybridDetector:
             'decision_path': self._get_decision_path(sig_confidence, ml_confidence, final_decision)
         }
     
+    def _score_ml(self, X_processed: np.ndarray) -> Tuple[int, float, int, float]:
+        """Score one feature vector with the supervised and unsupervised models"""
+        # Supervised prediction
+        try:
+            supervised_proba = self.supervised_model.predict_proba(X_processed.reshape(1, -1))[0]
+            supervised_pred = self.supervised_model.predict(X_processed.reshape(1, -1))[0]
+            supervised_confidence = supervised_proba[1] if len(supervised_proba) > 1 else supervised_proba[0]
+        except:
+            supervised_pred = 0
+            supervised_confidence = 0.0
+        
+        # Unsupervised prediction
+        try:
+            # Get anomaly score for confidence
+            if self.unsupervised_model_name == 'isolation_forest':
+                preds, scores = self.unsupervised_model.predict_anomaly_with_scores(
+                    self.unsupervised_model_name,
+                    X_processed.reshape(1, -1)
+                )
+                unsupervised_pred, score = preds[0], scores[0]
+                unsupervised_confidence = min(1.0, max(0.0, (score - 0) / 2))  # Normalize
+            else:
+                unsupervised_pred = self.unsupervised_model.predict_anomaly(
+                    self.unsupervised_model_name, 
+                    X_processed.reshape(1, -1)
+                )[0]
+                unsupervised_confidence = 0.7 if unsupervised_pred == 1 else 0.3
+        except:
+            unsupervised_pred = 0
+            unsupervised_confidence = 0.0
+        
+        return supervised_pred, supervised_confidence, unsupervised_pred, unsupervised_confidence
+    
+    def _score_ml_batch(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Score a feature matrix with one call per model instead of one per row"""
+        n = X.shape[0]
+        
+        # Supervised prediction
+        try:
+            supervised_proba = self.supervised_model.predict_proba(X)
+            supervised_pred = np.asarray(self.supervised_model.predict(X), dtype=int)
+            supervised_confidence = supervised_proba[:, 1] if supervised_proba.shape[1] > 1 else supervised_proba[:, 0]
+        except Exception as e:
+            logger.warning(f"Supervised batch prediction failed: {e}")
+            supervised_pred = np.zeros(n, dtype=int)
+            supervised_confidence = np.zeros(n)
+        
+        # Unsupervised prediction
+        try:
+            # Get anomaly score for confidence
+            if self.unsupervised_model_name == 'isolation_forest':
+                unsupervised_pred, scores = self.unsupervised_model.predict_anomaly_with_scores(
+                    self.unsupervised_model_name, X
+                )
+                unsupervised_confidence = np.clip(scores / 2, 0.0, 1.0)  # Normalize
+            else:
+                unsupervised_pred = np.asarray(
+                    self.unsupervised_model.predict_anomaly(self.unsupervised_model_name, X), dtype=int
+                )
+                unsupervised_confidence = np.where(unsupervised_pred == 1, 0.7, 0.3)
+        except Exception as e:
+            logger.warning(f"Unsupervised batch prediction failed: {e}")
+            unsupervised_pred = np.zeros(n, dtype=int)
+            unsupervised_confidence = np.zeros(n)
+        
+        return supervised_pred, supervised_confidence, unsupervised_pred, unsupervised_confidence
+    
     def _fuse_decisions(self, sig_attack: bool, sig_confidence: float,
                        ml_attack: bool, ml_confidence: float) -> Tuple[bool, float, bool]:
         """
@@ -205,6 +267,37 @@ class HybridDetector:
             else:
                 return False, 1 - ml_confidence, False
     
+    def _fuse_decisions_batch(self, sig_confidence: np.ndarray,
+                              ml_confidence: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorised form of _fuse_decisions over a whole batch
+        
+        Returns:
+            Tuple of (is_attack, confidence, path_code) arrays, where path_code
+            indexes DECISION_PATHS (2 is the signature/ML conflict)
+        """
+        high = sig_confidence > 0.8
+        medium = ~high & (sig_confidence > 0.5)
+        low = ~high & ~medium
+        
+        conditions = [
+            high,
+            medium & (ml_confidence > 0.6),
+            medium & (ml_confidence <= 0.6),
+            low & (ml_confidence > 0.7),
+        ]
+        path_code = np.select(conditions, [0, 1, 2, 3], default=4)
+        confidence = np.select(conditions, [
+            sig_confidence,
+            self.signature_weight * sig_confidence +
+            (self.supervised_weight + self.unsupervised_weight) * ml_confidence,
+            1 - sig_confidence,
+            ml_confidence,
+        ], default=1 - ml_confidence)
+        is_attack = (path_code <= 1) | (path_code == 3)
+        
+        return is_attack, confidence, path_code
+    
     def _get_decision_path(self, sig_confidence: float, ml_confidence: float, 
                           final_decision: bool) -> str:
         """Get human-readable decision path"""
@@ -223,8 +316,6 @@ class HybridDetector:
     
     def detect_batch(self, df: pd.DataFrame) -> pd.DataFrame:
         """Detect attacks in a batch of data"""
-        results = []
-        
         # Preprocess if preprocessor available
         if self.preprocessor is not None:
             try:
@@ -234,18 +325,54 @@ class HybridDetector:
         else:
             X_processed = None
         
-        for i, (idx, row) in enumerate(df.iterrows()):
-            if X_processed is not None:
-                # Use enumerate index since X_processed has reset index
-                X_row = X_processed.iloc[i].values if hasattr(X_processed, 'iloc') else X_processed[i]
-            else:
-                X_row = None
-            
-            result = self.detect(row, X_row)
-            result['index'] = idx
-            results.append(result)
+        # Signatures are evaluated once for the whole batch
+        sig_matched, sig_confidence, sig_idx = self.signature_detector.check_signatures_batch(df)
+        sig_names = np.array(self.signature_detector.signature_names + ['Normal'])
+        
+        n = len(df)
+        supervised_pred = np.zeros(n, dtype=int)
+        supervised_confidence = np.zeros(n)
+        unsupervised_pred = np.zeros(n, dtype=int)
+        unsupervised_confidence = np.zeros(n)
+        
+        use_ml = X_processed is not None and self.supervised_model is not None and self.unsupervised_model is not None
+        if use_ml:
+            X = np.ascontiguousarray(X_processed, dtype=np.float32)
+            (supervised_pred, supervised_confidence,
+             unsupervised_pred, unsupervised_confidence) = self._score_ml_batch(X)
+        
+        # Combine ML predictions and fuse with signatures for the whole batch
+        ml_confidence = (
+            self.supervised_weight * supervised_confidence +
+            self.unsupervised_weight * unsupervised_confidence
+        )
+        ml_attack = (
+            self.supervised_weight * supervised_pred +
+            self.unsupervised_weight * unsupervised_pred
+        ) > 0.5
+        is_attack, confidence, path_code = self._fuse_decisions_batch(sig_confidence, ml_confidence)
+        conflict = path_code == 2
         
-        return pd.DataFrame(results)
+        # Update statistics
+        self.stats['signature_detections'] += int(sig_matched.sum())
+        self.stats['ml_detections'] += int(ml_attack.sum())
+        self.stats['hybrid_detections'] += int(is_attack.sum())
+        self.stats['conflicts'] += int(conflict.sum())
+        
+        return pd.DataFrame({
+            'is_attack': is_attack,
+            'confidence': confidence,
+            'signature_detected': sig_matched,
+            'signature_confidence': sig_confidence,
+            'signature_name': sig_names[np.where(sig_matched, sig_idx, -1)],
+            'ml_detected': ml_attack,
+            'ml_confidence': ml_confidence,
+            'supervised_prediction': supervised_pred,
+            'unsupervised_prediction': unsupervised_pred,
+            'conflict': conflict,
+            'decision_path': DECISION_PATHS[path_code],
+            'index': df.index,
+        })
     
     def get_statistics(self) -> Dict:
         """Get detection statistics"""
@@ -7,12 +7,20 @@ allowing models to adapt to new attack patterns without full retraining.
 
 import numpy as np
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 from datetime import datetime
+from sklearn.linear_model import SGDClassifier
 
 logger = logging.getLogger(__name__)
 
 
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return 0.0
+
+
 class OnlineLearner:
     """
     Online learning system for adaptive model updates.
@@ -21,7 +29,9 @@ class OnlineLearner:
     enabling the NIDS to adapt to evolving threats.
     """
     
-    def __init__(self, learning_rate: float = 0.01, window_size: int = 1000):
+    def __init__(self, learning_rate: float = 0.01, window_size: int = 1000,
+                 flush_size: int = 1024,
+                 feature_names: Optional[Sequence[str]] = None):
         self.learning_rate = learning_rate
         self.window_size = window_size
         self.sample_buffer: List[Dict] = []
@@ -29,6 +39,21 @@ class OnlineLearner:
         self.update_count = 0
         self.last_update: Optional[datetime] = None
         self.metrics_history: List[Dict] = []
+        # Column order, fixed by the first sample so every update shares a layout
+        self._feature_names: Optional[tuple] = None
+        # Default incremental model: one vectorised partial_fit call per batch
+        self.model = self._new_model()
+        # Named models fed by update_from_packet
+        self.models: Dict[str, Any] = {}
+        
+        # Packet buffer for update_from_packet, allocated once the feature
+        # count is known and flushed to partial_fit every flush_size packets
+        self.flush_size = flush_size
+        self._buf_X: Optional[np.ndarray] = None
+        self._buf_y = np.empty(flush_size, dtype=np.int8)
+        self._buf_n = 0
+        if feature_names is not None:
+            self.set_feature_schema(feature_names)
         
         logger.info(f"OnlineLearner initialized (lr={learning_rate}, window={window_size})")
     
@@ -48,6 +73,95 @@ class OnlineLearner:
             self.sample_buffer = self.sample_buffer[-self.window_size:]
             self.label_buffer = self.label_buffer[-self.window_size:]
     
+    def set_feature_schema(self, names: Sequence[str]) -> None:
+        """
+        Fix the feature columns (and their order) used for every update.
+        
+        Without a schema the keys of the first sample are used. Packets
+        already buffered under a different layout are discarded.
+        """
+        names = tuple(names)
+        if names == self._feature_names and self._buf_X is not None:
+            return
+        self._feature_names = names
+        self._buf_X = np.empty((self.flush_size, len(names)), dtype=np.float32)
+        self._buf_n = 0
+    
+    def _new_model(self) -> SGDClassifier:
+        return SGDClassifier(
+            loss='log_loss',
+            learning_rate='constant',
+            eta0=self.learning_rate,
+            random_state=42
+        )
+    
+    def update_from_packet(self, model_name: str, features: Dict,
+                           label: Optional[str] = None,
+                           feedback: Optional[bool] = None) -> Optional[Dict]:
+        """
+        Buffer one labelled packet and update the model once the buffer fills.
+        
+        Args:
+            model_name: Name of the online model to update
+            features: Dictionary of feature values
+            label: Ground truth label; 'normal'/'benign'/'0' is class 0,
+                anything else is an attack
+            feedback: Analyst verdict (True = malicious), used when no label
+            
+        Returns:
+            Update metrics when the buffer was flushed, otherwise None
+        """
+        if label is not None:
+            y = 0 if str(label).strip().lower() in ('normal', 'benign', '0') else 1
+        elif feedback is not None:
+            y = int(bool(feedback))
+        else:
+            # Unlabelled packets cannot be learned from
+            return None
+        
+        if self._buf_X is None:
+            self.set_feature_schema(self._feature_names or features.keys())
+        
+        # Written straight into the preallocated buffer row; keys outside the
+        # schema are ignored and missing ones read as 0
+        row = [features.get(key) or 0 for key in self._feature_names]
+        try:
+            self._buf_X[self._buf_n] = row
+        except (ValueError, TypeError):
+            self._buf_X[self._buf_n] = [_to_float(value) for value in row]
+        self._buf_y[self._buf_n] = y
+        self._buf_n += 1
+        
+        if self._buf_n >= self.flush_size:
+            return self.flush(model_name)
+        return None
+    
+    def flush(self, model_name: str) -> Optional[Dict]:
+        """Fit the named model on all buffered packets with one partial_fit call"""
+        if self._buf_n == 0:
+            return None
+        
+        n = self._buf_n
+        self._buf_n = 0
+        model = self.models.setdefault(model_name, self._new_model())
+        try:
+            model.partial_fit(self._buf_X[:n], self._buf_y[:n], classes=[0, 1])
+        except Exception as e:
+            logger.error(f"Online update of {model_name} failed: {e}")
+            return None
+        
+        self.update_count += 1
+        self.last_update = datetime.now()
+        metrics = {
+            'model_name': model_name,
+            'update_count': self.update_count,
+            'samples_used': n,
+            'timestamp': self.last_update.isoformat()
+        }
+        self.metrics_history.append(metrics)
+        logger.info(f"Online update #{self.update_count} of {model_name} completed")
+        return metrics
+    
     def should_update(self, min_samples: int = 100) -> bool:
         """
         Check if we have enough new samples to trigger an update.
@@ -60,16 +174,18 @@ class OnlineLearner:
         """
         return len(self.sample_buffer) >= min_samples
     
-    def update_model(self, model: Any) -> Optional[Dict]:
+    def update_model(self, model: Any = None, passes: int = 1) -> Optional[Dict]:
         """
         Perform incremental update on the model.
         
-        Note: This is a placeholder - actual implementation depends on
-        the model type (sklearn models typically don't support online learning,
-        would need to use partial_fit or retrain with recent data).
+        Models without partial_fit are skipped (they would need a full
+        retrain on recent data).
         
         Args:
-            model: The model to update
+            model: The model to update; defaults to the learner's SGDClassifier
+            passes: Number of partial_fit passes over the buffered batch. A
+                single pass is one SGD epoch, so it moves the model less than
+                fit() would on the same data.
             
         Returns:
             Dictionary with update metrics, or None if update failed
@@ -77,12 +193,16 @@ class OnlineLearner:
         if not self.sample_buffer:
             return None
         
+        if model is None:
+            model = self.model
+        
         try:
             # Check if model supports partial_fit
             if hasattr(model, 'partial_fit'):
                 X = self._features_to_array(self.sample_buffer)
                 y = np.array(self.label_buffer)
-                model.partial_fit(X, y, classes=[0, 1])
+                for _ in range(passes):
+                    model.partial_fit(X, y, classes=[0, 1])
                 
                 self.update_count += 1
                 self.last_update = datetime.now()
@@ -90,6 +210,7 @@ class OnlineLearner:
                 metrics = {
                     'update_count': self.update_count,
                     'samples_used': len(self.sample_buffer),
+                    'passes': passes,
                     'timestamp': self.last_update.isoformat()
                 }
                 self.metrics_history.append(metrics)
@@ -113,24 +234,24 @@ class OnlineLearner:
         if not samples:
             return np.array([])
         
-        # Get all feature keys from first sample
-        keys = list(samples[0].keys())
+        if self._feature_names is None:
+            self._feature_names = tuple(samples[0].keys())
+        keys = self._feature_names
         
-        # Build feature matrix
-        X = np.zeros((len(samples), len(keys)))
-        for i, sample in enumerate(samples):
-            for j, key in enumerate(keys):
-                try:
-                    X[i, j] = float(sample.get(key, 0))
-                except (ValueError, TypeError):
-                    X[i, j] = 0.0
-        
-        return X
+        # Missing/None/empty values become 0, as float() failures did before
+        rows = [[sample.get(key) or 0 for key in keys] for sample in samples]
+        try:
+            # One C-level conversion for the whole matrix
+            return np.array(rows, dtype=np.float64)
+        except (ValueError, TypeError):
+            # Non-numeric values present - coerce cell by cell
+            return np.array([[_to_float(value) for value in row] for row in rows])
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get online learning statistics."""
         return {
             'buffer_size': len(self.sample_buffer),
+            'packet_buffer_size': self._buf_n,
             'update_count': self.update_count,
             'last_update': self.last_update.isoformat() if self.last_update else None,
             'learning_rate': self.learning_rate,
@@ -144,4 +265,8 @@ class OnlineLearner:
         self.update_count = 0
         self.last_update = None
         self.metrics_history = []
+        self._feature_names = None
+        self.models = {}
+        self._buf_X = None
+        self._buf_n = 0
         logger.info("OnlineLearner reset")
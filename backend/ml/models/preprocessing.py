@@ -20,6 +20,7 @@ class DataPreprocessor:
         self.label_encoders = {}
         self.feature_selector = SelectKBest(f_classif, k=feature_selection_k)
         self.selected_features = None
+        self.feature_columns = None
         self.is_fitted = False
         
     def extract_temporal_features(self, df):
@@ -116,20 +117,24 @@ class DataPreprocessor:
         if 'Timestamp' in df.columns:
             df = df.drop('Timestamp', axis=1)
         
-        # Separate features and target
+        # Separate features and target; the numeric feature columns are
+        # resolved once and handed to sklearn as a float32 matrix
         if target_col in df.columns:
-            X = df.drop(target_col, axis=1)
+            X = df.drop(columns=[target_col])
             y = df[target_col]
         else:
             X = df
             y = None
+        X = X.select_dtypes(include=[np.number, 'bool'])
+        self.feature_columns = X.columns.tolist()
         
         # Feature selection
         if y is not None:
-            X_selected = self.feature_selector.fit_transform(X, y)
+            X_selected = self.feature_selector.fit_transform(X.to_numpy(dtype=np.float32, copy=False), y)
             self.selected_features = X.columns[self.feature_selector.get_support()].tolist()
         else:
             X_selected = X[self.selected_features] if self.selected_features else X
+            X_selected = X_selected.to_numpy(dtype=np.float32, copy=False)
         
         # Scale features
         X_scaled = self.scaler.fit_transform(X_selected)
@@ -162,14 +167,16 @@ class DataPreprocessor:
         if 'Timestamp' in df.columns:
             df = df.drop('Timestamp', axis=1)
         
-        # Select features
+        # Select features (the same columns, in the same order, as at fit time)
         if self.selected_features:
             X = df[self.selected_features]
+        elif self.feature_columns is not None:
+            X = df[self.feature_columns]
         else:
             X = df
         
         # Scale features
-        X_scaled = self.scaler.transform(X)
+        X_scaled = self.scaler.transform(X.to_numpy(dtype=np.float32, copy=False))
         
         return pd.DataFrame(X_scaled, columns=self.selected_features if self.selected_features else X.columns)
     
@@ -180,6 +187,7 @@ class DataPreprocessor:
             'label_encoders': self.label_encoders,
             'feature_selector': self.feature_selector,
             'selected_features': self.selected_features,
+            'feature_columns': self.feature_columns,
             'is_fitted': self.is_fitted
         }, filepath)
     
@@ -190,6 +198,7 @@ class DataPreprocessor:
         self.label_encoders = data['label_encoders']
         self.feature_selector = data['feature_selector']
         self.selected_features = data['selected_features']
+        self.feature_columns = data.get('feature_columns')
         self.is_fitted = data['is_fitted']
         return self
 
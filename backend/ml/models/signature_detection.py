@@ -4,10 +4,82 @@ Pattern matching against known attack signatures for fast, deterministic detecti
 """
 
 import re
-from typing import Dict, Tuple, Optional, List
+import numbers
+from typing import Dict, NamedTuple, Tuple, Optional, List
+import numpy as np
 import pandas as pd
 
 
+# Payload patterns, matched case-insensitively against the user agent
+SQL_INJECTION_PATTERN = re.compile(
+    r"(?:union\s+select)|(?:or\s+1\s*=\s*1)|(?:drop\s+table)|(?:;\s*delete)|(?:--\s*$)|(?:'\s*or\s*')",
+    re.IGNORECASE
+)
+XSS_PATTERN = re.compile(
+    r"(?:<script)|(?:javascript:)|(?:onerror\s*=)|(?:onload\s*=)|(?:alert\s*\()",
+    re.IGNORECASE
+)
+
+# Port classes used by the signatures, as bits in a per-port lookup table
+WELL_KNOWN_PORT = 1
+TELNET_PORT = 2
+SSH_PORT = 4
+DATABASE_PORT = 8
+HTTP_PORT = 16
+DNS_PORT = 32
+
+
+def _build_port_lut() -> np.ndarray:
+    """Port -> class bits; the extra last slot is for missing/out-of-range ports"""
+    lut = np.zeros(65537, dtype=np.uint8)
+    lut[:1024] |= WELL_KNOWN_PORT
+    lut[23] |= TELNET_PORT
+    lut[22] |= SSH_PORT
+    lut[[3306, 5432, 1433, 27017]] |= DATABASE_PORT
+    lut[[80, 8080, 8000, 8443, 443]] |= HTTP_PORT
+    lut[53] |= DNS_PORT
+    return lut
+
+
+PORT_LUT = _build_port_lut()
+
+
+class PacketView(NamedTuple):
+    """Typed, pre-normalised packet fields read by the per-row signatures
+    
+    Sizes/ports go through _as_number (non-numeric values become NaN, so
+    every comparison is False) and text fields are always strings, so the
+    patterns cannot raise.
+    """
+    protocol: str
+    flags: str
+    payload: float
+    port: float
+    request_type: str
+    user_agent: str
+
+
+def _as_number(value) -> float:
+    """Numeric coercion shared by the per-row and batch paths
+    
+    Real numbers pass through, numeric strings are parsed and anything else
+    becomes NaN.
+    """
+    if isinstance(value, numbers.Real):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def _as_numbers(values: pd.Series) -> np.ndarray:
+    """Column form of _as_number; numeric columns skip the per-value loop"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    return np.fromiter((_as_number(v) for v in values), dtype=float, count=len(values))
+
+
 class SignatureDetector:
     """
     Signature-based intrusion detector using pattern matching
@@ -20,6 +92,15 @@ class SignatureDetector:
         # Known attack signatures organized by category
         self.signatures = self._load_signatures()
         
+        # Flat, declaration-ordered view used by the batch path
+        self._ordered_signatures = [
+            sig for signatures in self.signatures.values() for sig in signatures
+        ]
+        self.signature_names = [sig['name'] for sig in self._ordered_signatures]
+        self._signature_confidences = np.array(
+            [sig['confidence'] for sig in self._ordered_signatures]
+        )
+        
     def _load_signatures(self) -> Dict[str, List[Dict]]:
         """Load known attack signatures"""
         return {
@@ -27,16 +108,15 @@ class SignatureDetector:
             'port_scan': [
                 {
                     'name': 'Sequential Port Scan',
-                    'pattern': lambda row: self._check_port_scan(row),
+                    'pattern': lambda pkt: self._check_port_scan(pkt),
+                    'batch_pattern': lambda cols: cols['small'] & ((cols['port_bits'] & WELL_KNOWN_PORT) != 0),
                     'confidence': 0.85,
                     'severity': 'medium'
                 },
                 {
                     'name': 'SYN Scan',
-                    'pattern': lambda row: (
-                        row.get('Protocol', '').upper() == 'TCP' and
-                        'S' in str(row.get('ip_flags', row.get('tcp_flags', '')))
-                    ),
+                    'pattern': lambda pkt: pkt.protocol == 'TCP' and 'S' in pkt.flags,
+                    'batch_pattern': lambda cols: cols['is_tcp'] & cols['syn_flag'],
                     'confidence': 0.75,
                     'severity': 'medium'
                 },
@@ -46,29 +126,22 @@ class SignatureDetector:
             'dos': [
                 {
                     'name': 'ICMP Flood',
-                    'pattern': lambda row: (
-                        row.get('Protocol', '').upper() == 'ICMP' and
-                        row.get('Payload_Size', row.get('packet_size', 0)) > 1000
-                    ),
+                    'pattern': lambda pkt: pkt.protocol == 'ICMP' and pkt.payload > 1000,
+                    'batch_pattern': lambda cols: cols['is_icmp'] & (cols['payload'] > 1000),
                     'confidence': 0.80,
                     'severity': 'high'
                 },
                 {
                     'name': 'SYN Flood',
-                    'pattern': lambda row: (
-                        row.get('Protocol', '').upper() == 'TCP' and
-                        row.get('Payload_Size', row.get('packet_size', 0)) < 100 and
-                        'S' in str(row.get('ip_flags', row.get('tcp_flags', '')))
-                    ),
+                    'pattern': lambda pkt: pkt.protocol == 'TCP' and pkt.payload < 100 and 'S' in pkt.flags,
+                    'batch_pattern': lambda cols: cols['is_tcp'] & cols['small'] & cols['syn_flag'],
                     'confidence': 0.85,
                     'severity': 'critical'
                 },
                 {
                     'name': 'UDP Flood',
-                    'pattern': lambda row: (
-                        row.get('Protocol', '').upper() == 'UDP' and
-                        row.get('Payload_Size', row.get('packet_size', 0)) > 1400
-                    ),
+                    'pattern': lambda pkt: pkt.protocol == 'UDP' and pkt.payload > 1400,
+                    'batch_pattern': lambda cols: cols['is_udp'] & (cols['payload'] > 1400),
                     'confidence': 0.70,
                     'severity': 'high'
                 },
@@ -78,19 +151,22 @@ class SignatureDetector:
             'suspicious_port': [
                 {
                     'name': 'Telnet Access',
-                    'pattern': lambda row: row.get('Port', row.get('dst_port', 0)) == 23,
+                    'pattern': lambda pkt: pkt.port == 23,
+                    'batch_pattern': lambda cols: (cols['port_bits'] & TELNET_PORT) != 0,
                     'confidence': 0.65,
                     'severity': 'medium'
                 },
                 {
                     'name': 'SSH Brute Force Port',
-                    'pattern': lambda row: row.get('Port', row.get('dst_port', 0)) == 22,
+                    'pattern': lambda pkt: pkt.port == 22,
+                    'batch_pattern': lambda cols: (cols['port_bits'] & SSH_PORT) != 0,
                     'confidence': 0.50,
                     'severity': 'low'
                 },
                 {
                     'name': 'Database Port Access',
-                    'pattern': lambda row: row.get('Port', row.get('dst_port', 0)) in [3306, 5432, 1433, 27017],
+                    'pattern': lambda pkt: pkt.port in [3306, 5432, 1433, 27017],
+                    'batch_pattern': lambda cols: (cols['port_bits'] & DATABASE_PORT) != 0,
                     'confidence': 0.60,
                     'severity': 'medium'
                 },
@@ -100,19 +176,19 @@ class SignatureDetector:
             'protocol_anomaly': [
                 {
                     'name': 'HTTP on Non-Standard Port',
-                    'pattern': lambda row: (
-                        row.get('Request_Type', row.get('request_type', '')).upper() == 'HTTP' and
-                        row.get('Port', row.get('dst_port', 0)) not in [80, 8080, 8000, 8443, 443]
+                    'pattern': lambda pkt: (
+                        pkt.request_type == 'HTTP' and pkt.port not in [80, 8080, 8000, 8443, 443]
+                    ),
+                    'batch_pattern': lambda cols: (
+                        (cols['request_type'] == 'HTTP') & ((cols['port_bits'] & HTTP_PORT) == 0)
                     ),
                     'confidence': 0.55,
                     'severity': 'low'
                 },
                 {
                     'name': 'DNS Tunneling Suspect',
-                    'pattern': lambda row: (
-                        row.get('Port', row.get('dst_port', 0)) == 53 and
-                        row.get('Payload_Size', row.get('packet_size', 0)) > 512
-                    ),
+                    'pattern': lambda pkt: pkt.port == 53 and pkt.payload > 512,
+                    'batch_pattern': lambda cols: ((cols['port_bits'] & DNS_PORT) != 0) & (cols['payload'] > 512),
                     'confidence': 0.70,
                     'severity': 'high'
                 },
@@ -122,62 +198,45 @@ class SignatureDetector:
             'malicious_request': [
                 {
                     'name': 'SQL Injection Pattern',
-                    'pattern': lambda row: self._check_sql_injection(row),
+                    'pattern': lambda pkt: self._check_sql_injection(pkt),
+                    'batch_pattern': lambda cols: cols['user_agent'].str.contains(SQL_INJECTION_PATTERN).to_numpy(),
                     'confidence': 0.90,
                     'severity': 'critical'
                 },
                 {
                     'name': 'XSS Pattern',
-                    'pattern': lambda row: self._check_xss(row),
+                    'pattern': lambda pkt: self._check_xss(pkt),
+                    'batch_pattern': lambda cols: cols['user_agent'].str.contains(XSS_PATTERN).to_numpy(),
                     'confidence': 0.85,
                     'severity': 'high'
                 },
             ],
         }
     
-    def _check_port_scan(self, row) -> bool:
+    def _check_port_scan(self, pkt: PacketView) -> bool:
         """Check for port scan indicators"""
-        # Low payload with many different destination ports
-        payload_size = row.get('Payload_Size', row.get('packet_size', 0))
-        port = row.get('Port', row.get('dst_port', 0))
-        
         # Heuristic: small packets to well-known ports are often scans
-        if payload_size < 100 and port < 1024:
-            return True
-        return False
+        return pkt.payload < 100 and pkt.port < 1024
     
-    def _check_sql_injection(self, row) -> bool:
+    def _check_sql_injection(self, pkt: PacketView) -> bool:
         """Check for SQL injection patterns in payload/user agent"""
-        suspicious_patterns = [
-            r"(?i)(union\s+select)",
-            r"(?i)(or\s+1\s*=\s*1)",
-            r"(?i)(drop\s+table)",
-            r"(?i)(;\s*delete)",
-            r"(?i)(--\s*$)",
-            r"(?i)('\s*or\s*')",
-        ]
-        
-        user_agent = str(row.get('User_Agent', row.get('user_agent', '')))
-        for pattern in suspicious_patterns:
-            if re.search(pattern, user_agent):
-                return True
-        return False
+        return SQL_INJECTION_PATTERN.search(pkt.user_agent) is not None
     
-    def _check_xss(self, row) -> bool:
+    def _check_xss(self, pkt: PacketView) -> bool:
         """Check for XSS patterns"""
-        suspicious_patterns = [
-            r"(?i)(<script)",
-            r"(?i)(javascript:)",
-            r"(?i)(onerror\s*=)",
-            r"(?i)(onload\s*=)",
-            r"(?i)(alert\s*\()",
-        ]
-        
-        user_agent = str(row.get('User_Agent', row.get('user_agent', '')))
-        for pattern in suspicious_patterns:
-            if re.search(pattern, user_agent):
-                return True
-        return False
+        return XSS_PATTERN.search(pkt.user_agent) is not None
+    
+    @staticmethod
+    def _packet_view(row: Dict) -> PacketView:
+        """Resolve the fields the signatures read, once per packet"""
+        return PacketView(
+            protocol=str(row.get('Protocol', '')).upper(),
+            flags=str(row.get('ip_flags', row.get('tcp_flags', ''))),
+            payload=_as_number(row.get('Payload_Size', row.get('packet_size', 0))),
+            port=_as_number(row.get('Port', row.get('dst_port', 0))),
+            request_type=str(row.get('Request_Type', row.get('request_type', ''))).upper(),
+            user_agent=str(row.get('User_Agent', row.get('user_agent', ''))),
+        )
     
     def detect(self, row: pd.Series) -> Tuple[bool, float, str]:
         """
@@ -197,19 +256,83 @@ class SignatureDetector:
         else:
             row_dict = row
         
-        for category, signatures in self.signatures.items():
-            for sig in signatures:
-                try:
-                    if sig['pattern'](row_dict):
-                        # Found a match - track highest confidence
-                        if sig['confidence'] > best_match[1]:
-                            best_match = (True, sig['confidence'], sig['name'])
-                except Exception:
-                    # Skip signatures that fail to match
-                    continue
+        # The view is normalised up front, so the patterns need no try/except
+        pkt = self._packet_view(row_dict)
+        for sig in self._ordered_signatures:
+            if sig['pattern'](pkt):
+                # Found a match - track highest confidence
+                if sig['confidence'] > best_match[1]:
+                    best_match = (True, sig['confidence'], sig['name'])
         
         return best_match
     
+    def _batch_columns(self, df: pd.DataFrame) -> Dict:
+        """Resolve the columns the signatures read, once per batch
+        
+        Mirrors the ``row.get(primary, row.get(fallback, default))`` lookups
+        of _packet_view so both paths agree on every packet.
+        """
+        def column(primary, fallback, default):
+            if primary in df.columns:
+                return df[primary]
+            if fallback is not None and fallback in df.columns:
+                return df[fallback]
+            return pd.Series(default, index=df.index)
+        
+        def numeric(primary, fallback):
+            return _as_numbers(column(primary, fallback, 0))
+        
+        def text(primary, fallback):
+            return column(primary, fallback, '').fillna('').astype(str)
+        
+        protocol = text('Protocol', None).str.upper().to_numpy()
+        payload = numeric('Payload_Size', 'packet_size')
+        
+        # Port predicates become one table lookup. Only whole ports can equal
+        # a listed port, so fractional ones are sent to port 0 (just "< 1024")
+        # or the empty last slot, like NaN and ports above 65535; negatives
+        # land on port 0 as well
+        port = numeric('Port', 'dst_port')
+        whole = port == np.floor(port)
+        port = np.where(whole, port, np.where(port < 1024, 0, 65536)).clip(0, 65536)
+        return {
+            'is_tcp': protocol == 'TCP',
+            'is_udp': protocol == 'UDP',
+            'is_icmp': protocol == 'ICMP',
+            'syn_flag': text('ip_flags', 'tcp_flags').str.contains('S', regex=False).to_numpy(),
+            'payload': payload,
+            'small': payload < 100,
+            'port_bits': PORT_LUT[port.astype(np.intp)],
+            'request_type': text('Request_Type', 'request_type').str.upper().to_numpy(),
+            'user_agent': text('User_Agent', 'user_agent'),
+        }
+    
+    def check_signatures_batch(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate every signature over a whole batch as boolean masks
+        
+        Args:
+            df: DataFrame of packet data
+            
+        Returns:
+            Tuple of (matched, confidence, name_idx) arrays, one entry per row.
+            ``name_idx`` indexes the signature list and is only meaningful
+            where ``matched`` is True.
+        """
+        cols = self._batch_columns(df)
+        masks = np.stack([
+            np.asarray(sig['batch_pattern'](cols), dtype=bool)
+            for sig in self._ordered_signatures
+        ])
+        
+        # Highest-confidence match wins; argmax keeps the first signature on
+        # ties, matching the strict ">" of the per-row detect()
+        scores = np.where(masks, self._signature_confidences[:, None], -1.0)
+        name_idx = scores.argmax(axis=0)
+        matched = masks.any(axis=0)
+        confidence = np.where(matched, self._signature_confidences[name_idx], 0.0)
+        return matched, confidence, name_idx
+    
     def detect_batch(self, df: pd.DataFrame) -> List[Dict]:
         """
         Detect attacks in a batch of packets
@@ -220,15 +343,15 @@ class SignatureDetector:
         Returns:
             List of detection results
         """
-        results = []
-        for _, row in df.iterrows():
-            is_attack, confidence, name = self.detect(row)
-            results.append({
+        matched, confidence, name_idx = self.check_signatures_batch(df)
+        return [
+            {
                 'signature_detected': is_attack,
-                'signature_confidence': confidence,
-                'signature_name': name
-            })
-        return results
+                'signature_confidence': conf,
+                'signature_name': self.signature_names[idx] if is_attack else 'Normal'
+            }
+            for is_attack, conf, idx in zip(matched.tolist(), confidence.tolist(), name_idx.tolist())
+        ]
     
     def get_signature_info(self, signature_name: str) -> Optional[Dict]:
         """Get information about a specific signature"""
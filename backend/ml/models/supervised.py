@@ -7,14 +7,30 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
+from sklearn.utils.class_weight import compute_class_weight
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, f1_score,
     roc_auc_score, confusion_matrix, classification_report
 )
 from xgboost import XGBClassifier
+from pathlib import Path
+from threadpoolctl import threadpool_limits
 import joblib
 import time
 
+try:
+    import lz4  # noqa: F401  (enables joblib's lz4 compressor)
+    MODEL_COMPRESSION = ('lz4', 3)
+except ImportError:
+    MODEL_COMPRESSION = ('zlib', 3)
+
+
+MODEL_DISPLAY_NAMES = {
+    'random_forest': 'Random Forest',
+    'logistic_regression': 'Logistic Regression',
+    'xgboost': 'XGBoost',
+}
+
 
 class SupervisedModelTrainer:
     """Trains and evaluates supervised models for known threat detection"""
@@ -26,101 +42,142 @@ class SupervisedModelTrainer:
     def train_random_forest(self, X_train, y_train, X_val, y_val, **kwargs):
         """Train Random Forest classifier"""
         print("Training Random Forest...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        rf = RandomForestClassifier(
-            n_estimators=kwargs.get('n_estimators', 100),
-            max_depth=kwargs.get('max_depth', 20),
-            min_samples_split=kwargs.get('min_samples_split', 5),
-            min_samples_leaf=kwargs.get('min_samples_leaf', 2),
-            random_state=42,
-            n_jobs=-1,
-            class_weight='balanced'
-        )
+        rf = self._pin_class_weight(self._build_random_forest(**kwargs), y_train)
         
-        rf.fit(X_train, y_train)
+        # Keep BLAS/OpenMP single-threaded inside the tree workers
+        with threadpool_limits(limits=1):
+            rf.fit(X_train, y_train)
         
-        # Evaluate
-        y_pred = rf.predict(X_val)
-        y_pred_proba = rf.predict_proba(X_val)[:, 1]
+        return self._evaluate('random_forest', rf, X_val, y_val, time.perf_counter() - start_time)
+    
+    def add_trees(self, X_train, y_train, X_val, y_val, k=10, model_name='random_forest'):
+        """Grow k more trees on an already trained forest and re-evaluate it
         
-        metrics = self._calculate_metrics(y_val, y_pred, y_pred_proba)
-        metrics['training_time'] = time.time() - start_time
-        metrics['feature_importance'] = dict(zip(
-            [f'feature_{i}' for i in range(len(rf.feature_importances_))],
-            rf.feature_importances_
-        ))
+        With warm_start the existing trees are kept and only the new ones are
+        fitted, so a retrain costs roughly k / n_estimators of a full fit. The
+        new trees use the class weights pinned at the initial fit.
+        """
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not found")
+        model = self.models[model_name]
+        # Forests fitted with class_weight='balanced' before the weights were
+        # pinned fall back to the balance of this batch
+        self._pin_class_weight(model, y_train)
+        start_time = time.perf_counter()
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + k)
+        try:
+            with threadpool_limits(limits=1):
+                model.fit(X_train, y_train)
+        finally:
+            model.set_params(warm_start=False)
         
-        self.models['random_forest'] = rf
-        self.results['random_forest'] = metrics
+        return self._evaluate(model_name, model, X_val, y_val, time.perf_counter() - start_time)
+    
+    @staticmethod
+    def _pin_class_weight(model, y):
+        """Replace class_weight='balanced' by the explicit weights it gives for y
         
-        print(f"Random Forest - Accuracy: {metrics['accuracy']:.4f}, F1: {metrics['f1']:.4f}")
-        return rf, metrics
+        'balanced' is recomputed on every fit, so trees added later with
+        warm_start would be weighted on the new batch (and sklearn warns
+        about the combination). Pinning the weights at the initial fit keeps
+        every tree on the same class balance.
+        """
+        if model.get_params().get('class_weight') == 'balanced':
+            classes = np.unique(y)
+            weights = compute_class_weight('balanced', classes=classes, y=y)
+            model.set_params(class_weight=dict(zip(classes.tolist(), weights.tolist())))
+        return model
     
     def train_logistic_regression(self, X_train, y_train, X_val, y_val, **kwargs):
         """Train Logistic Regression classifier"""
         print("Training Logistic Regression...")
-        start_time = time.time()
-        
-        lr = LogisticRegression(
-            max_iter=kwargs.get('max_iter', 1000),
-            C=kwargs.get('C', 1.0),
-            class_weight='balanced',
-            random_state=42,
-            solver='lbfgs'
-        )
+        start_time = time.perf_counter()
         
+        lr = self._build_logistic_regression(**kwargs)
         lr.fit(X_train, y_train)
         
-        # Evaluate
-        y_pred = lr.predict(X_val)
-        y_pred_proba = lr.predict_proba(X_val)[:, 1]
-        
-        metrics = self._calculate_metrics(y_val, y_pred, y_pred_proba)
-        metrics['training_time'] = time.time() - start_time
-        metrics['feature_importance'] = dict(zip(
-            [f'feature_{i}' for i in range(len(lr.coef_[0]))],
-            np.abs(lr.coef_[0])
-        ))
-        
-        self.models['logistic_regression'] = lr
-        self.results['logistic_regression'] = metrics
-        
-        print(f"Logistic Regression - Accuracy: {metrics['accuracy']:.4f}, F1: {metrics['f1']:.4f}")
-        return lr, metrics
+        return self._evaluate('logistic_regression', lr, X_val, y_val, time.perf_counter() - start_time)
     
     def train_xgboost(self, X_train, y_train, X_val, y_val, **kwargs):
         """Train XGBoost classifier"""
         print("Training XGBoost...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
-        xgb = XGBClassifier(
+        xgb = self._build_xgboost(**kwargs)
+        xgb.fit(X_train, y_train)
+        
+        return self._evaluate('xgboost', xgb, X_val, y_val, time.perf_counter() - start_time)
+    
+    def _build_random_forest(self, **kwargs):
+        n_estimators = kwargs.get('n_estimators', 100)
+        return RandomForestClassifier(
+            n_estimators=n_estimators,
+            max_depth=kwargs.get('max_depth', 20),
+            min_samples_split=kwargs.get('min_samples_split', 5),
+            min_samples_leaf=kwargs.get('min_samples_leaf', 2),
+            random_state=42,
+            # Trees are built in parallel; more workers than trees (or than
+            # physical cores) only adds contention
+            n_jobs=kwargs.get('n_jobs', min(joblib.cpu_count(only_physical_cores=True), n_estimators)),
+            verbose=kwargs.get('verbose', 0),
+            class_weight='balanced'
+        )
+    
+    def _build_logistic_regression(self, **kwargs):
+        return LogisticRegression(
+            max_iter=kwargs.get('max_iter', 1000),
+            C=kwargs.get('C', 1.0),
+            class_weight='balanced',
+            random_state=42,
+            solver='lbfgs'
+        )
+    
+    def _build_xgboost(self, **kwargs):
+        return XGBClassifier(
             n_estimators=kwargs.get('n_estimators', 100),
             max_depth=kwargs.get('max_depth', 6),
             learning_rate=kwargs.get('learning_rate', 0.1),
             random_state=42,
             scale_pos_weight=kwargs.get('scale_pos_weight', None),
-            eval_metric='logloss'
+            eval_metric='logloss',
+            # Histogram method: features are quantised once into a
+            # QuantileDMatrix by the wrapper; pass device='cuda' to train on GPU
+            tree_method='hist',
+            max_bin=kwargs.get('max_bin', 256),
+            device=kwargs.get('device', 'cpu'),
+            n_jobs=kwargs.get('n_jobs')
         )
-        
-        xgb.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred = xgb.predict(X_val)
-        y_pred_proba = xgb.predict_proba(X_val)[:, 1]
+    
+    def _evaluate(self, model_name, model, X_val, y_val, training_time):
+        """Score a fitted model on the validation set and record it"""
+        y_pred, y_pred_proba = self._predict_with_proba(model, X_val)
         
         metrics = self._calculate_metrics(y_val, y_pred, y_pred_proba)
-        metrics['training_time'] = time.time() - start_time
+        metrics['training_time'] = training_time
+        if hasattr(model, 'feature_importances_'):
+            importances = model.feature_importances_
+        else:
+            importances = np.abs(model.coef_[0])
         metrics['feature_importance'] = dict(zip(
-            [f'feature_{i}' for i in range(len(xgb.feature_importances_))],
-            xgb.feature_importances_
+            [f'feature_{i}' for i in range(len(importances))],
+            importances
         ))
         
-        self.models['xgboost'] = xgb
-        self.results['xgboost'] = metrics
+        self.models[model_name] = model
+        self.results[model_name] = metrics
         
-        print(f"XGBoost - Accuracy: {metrics['accuracy']:.4f}, F1: {metrics['f1']:.4f}")
-        return xgb, metrics
+        print(f"{MODEL_DISPLAY_NAMES.get(model_name, model_name)} - Accuracy: {metrics['accuracy']:.4f}, F1: {metrics['f1']:.4f}")
+        return model, metrics
+    
+    @staticmethod
+    def _timed_fit(model, X_train, y_train, blas_threads=None):
+        start_time = time.perf_counter()
+        # limits=None leaves the BLAS pools untouched
+        with threadpool_limits(limits=blas_threads, user_api='blas'):
+            model.fit(X_train, y_train)
+        return time.perf_counter() - start_time
     
     def train_all(self, X_train, y_train, X_val, y_val):
         """Train all supervised models"""
@@ -129,9 +186,28 @@ class SupervisedModelTrainer:
         # Calculate scale_pos_weight for XGBoost
         scale_pos_weight = (y_train == 0).sum() / (y_train == 1).sum()
         
-        self.train_random_forest(X_train, y_train, X_val, y_val)
-        self.train_logistic_regression(X_train, y_train, X_val, y_val)
-        self.train_xgboost(X_train, y_train, X_val, y_val, scale_pos_weight=scale_pos_weight)
+        # The fits run concurrently in threads (they release the GIL and share
+        # the training data without copies). Each model gets its own thread
+        # cap: the two ensembles split the physical cores through n_jobs, and
+        # LBFGS, whose only threads are BLAS ones, gets a single BLAS thread.
+        # That BLAS limit is process-wide but nothing else fitting here uses
+        # BLAS; OpenMP (XGBoost) is left alone.
+        share = max(1, joblib.cpu_count(only_physical_cores=True) // 2)
+        models = {
+            'random_forest': self._pin_class_weight(self._build_random_forest(n_jobs=share), y_train),
+            'logistic_regression': self._build_logistic_regression(),
+            'xgboost': self._build_xgboost(scale_pos_weight=scale_pos_weight, n_jobs=share),
+        }
+        print(f"Training {', '.join(MODEL_DISPLAY_NAMES[name] for name in models)} concurrently...")
+        blas_threads = {'logistic_regression': 1}
+        training_times = joblib.Parallel(n_jobs=len(models), backend='threading')(
+            joblib.delayed(self._timed_fit)(model, X_train, y_train, blas_threads.get(model_name))
+            for model_name, model in models.items()
+        )
+        
+        # Evaluation and reporting stay sequential
+        for (model_name, model), training_time in zip(models.items(), training_times):
+            self._evaluate(model_name, model, X_val, y_val, training_time)
         
         return self.models, self.results
     
@@ -143,41 +219,83 @@ class SupervisedModelTrainer:
         best_model_name = max(self.results.keys(), key=lambda k: self.results[k]['f1'])
         return best_model_name, self.models[best_model_name]
     
+    @staticmethod
+    def _predict_with_proba(model, X):
+        """Labels and positive-class probabilities from one predict_proba pass
+        
+        predict() on the ensembles walks every tree again just to take the
+        argmax of the same probabilities.
+        """
+        proba = model.predict_proba(X)
+        return model.classes_[proba.argmax(axis=1)], proba[:, 1]
+    
     def _calculate_metrics(self, y_true, y_pred, y_pred_proba):
         """Calculate evaluation metrics"""
+        cm = confusion_matrix(y_true, y_pred)
         return {
             'accuracy': accuracy_score(y_true, y_pred),
             'precision': precision_score(y_true, y_pred, zero_division=0),
             'recall': recall_score(y_true, y_pred),
             'f1': f1_score(y_true, y_pred),
             'roc_auc': roc_auc_score(y_true, y_pred_proba) if len(np.unique(y_true)) > 1 else 0,
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
-            'tn': confusion_matrix(y_true, y_pred)[0, 0],
-            'fp': confusion_matrix(y_true, y_pred)[0, 1],
-            'fn': confusion_matrix(y_true, y_pred)[1, 0],
-            'tp': confusion_matrix(y_true, y_pred)[1, 1]
+            'confusion_matrix': cm.tolist(),
+            'tn': cm[0, 0],
+            'fp': cm[0, 1],
+            'fn': cm[1, 0],
+            'tp': cm[1, 1]
         }
     
     def predict(self, model_name, X):
         """Make predictions using a trained model"""
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
-        return self.models[model_name].predict(X)
+        model = self.models[model_name]
+        if isinstance(model, XGBClassifier):
+            return model.classes_[self._xgb_proba(model, X).argmax(axis=1)]
+        return model.predict(X)
     
     def predict_proba(self, model_name, X):
         """Get prediction probabilities"""
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
-        return self.models[model_name].predict_proba(X)
+        model = self.models[model_name]
+        if isinstance(model, XGBClassifier):
+            return self._xgb_proba(model, X)
+        return model.predict_proba(X)
+    
+    @staticmethod
+    def _xgb_proba(model, X):
+        """Class probabilities straight from the native booster
+        
+        inplace_predict scores the array in C++ without building a DMatrix
+        per call, which dominates latency for the small batches seen online.
+        """
+        proba = model.get_booster().inplace_predict(X)
+        if proba.ndim == 1:
+            proba = np.column_stack([1 - proba, proba])
+        return proba
     
     def save_model(self, model_name, filepath):
-        """Save a model to disk"""
+        """Save a model to disk
+        
+        XGBoost models are also written in the booster's native JSON format
+        next to ``filepath``, which load_model prefers.
+        """
         if model_name not in self.models:
             raise ValueError(f"Model {model_name} not found")
-        joblib.dump(self.models[model_name], filepath)
+        model = self.models[model_name]
+        joblib.dump(model, filepath, compress=MODEL_COMPRESSION)
+        if isinstance(model, XGBClassifier):
+            model.save_model(str(Path(filepath).with_suffix('.json')))
     
     def load_model(self, model_name, filepath):
         """Load a model from disk"""
-        self.models[model_name] = joblib.load(filepath)
+        native_path = Path(filepath).with_suffix('.json')
+        if model_name == 'xgboost' and native_path.exists():
+            model = XGBClassifier()
+            model.load_model(str(native_path))
+            self.models[model_name] = model
+        else:
+            self.models[model_name] = joblib.load(filepath)
         return self.models[model_name]
 
@@ -1,15 +1,19 @@
 """
 Unsupervised Anomaly Detection Models for Novel Threat Detection
-Implements Isolation Forest, One-Class SVM, and Autoencoder
+Implements Isolation Forest, One-Class SVM (Nystroem-approximated), and Autoencoder
 """
 
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
-from sklearn.svm import OneClassSVM
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDOneClassSVM
+from sklearn.pipeline import make_pipeline
 from sklearn.metrics import roc_auc_score, precision_recall_curve, auc
+from threadpoolctl import threadpool_limits
 import joblib
 import time
+from .supervised import MODEL_COMPRESSION
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -22,6 +26,16 @@ except ImportError:
     print("TensorFlow not available. Autoencoder will use sklearn's MLPRegressor.")
 
 
+def _reconstruction_errors(X, reconstructions):
+    """Per-row mean squared reconstruction error
+    
+    One float32 difference buffer; einsum squares and sums it in a single pass
+    instead of materialising a separate squared array.
+    """
+    diff = np.subtract(X, reconstructions, dtype=np.float32)
+    return np.einsum('ij,ij->i', diff, diff) / diff.shape[1]
+
+
 class UnsupervisedModelTrainer:
     """Trains and evaluates unsupervised models for novel threat detection"""
     
@@ -33,16 +47,20 @@ class UnsupervisedModelTrainer:
     def train_isolation_forest(self, X_train, X_val, y_val=None, **kwargs):
         """Train Isolation Forest for anomaly detection"""
         print("Training Isolation Forest...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
+        n_estimators = kwargs.get('n_estimators', 100)
         iso_forest = IsolationForest(
-            n_estimators=kwargs.get('n_estimators', 100),
+            n_estimators=n_estimators,
             contamination=kwargs.get('contamination', 0.1),
             random_state=42,
-            n_jobs=-1
+            n_jobs=kwargs.get('n_jobs', min(joblib.cpu_count(only_physical_cores=True), n_estimators)),
+            verbose=kwargs.get('verbose', 0)
         )
         
-        iso_forest.fit(X_train)
+        # Keep BLAS/OpenMP single-threaded inside the tree workers
+        with threadpool_limits(limits=1):
+            iso_forest.fit(X_train)
         
         # Predict anomalies (1 = normal, -1 = anomaly)
         train_scores = iso_forest.decision_function(X_train)
@@ -65,7 +83,7 @@ class UnsupervisedModelTrainer:
             
             metrics = self._calculate_metrics(y_val, y_pred, val_anomaly_scores)
         
-        metrics['training_time'] = time.time() - start_time
+        metrics['training_time'] = time.perf_counter() - start_time
         metrics['threshold'] = threshold
         
         self.models['isolation_forest'] = iso_forest
@@ -77,15 +95,46 @@ class UnsupervisedModelTrainer:
         
         return iso_forest, metrics
     
+    def add_trees(self, X_train, k=10, model_name='isolation_forest'):
+        """Grow k more trees on an already trained Isolation Forest
+        
+        Existing trees are reused via warm_start; the stored threshold is
+        kept, so re-run train_isolation_forest if the data has drifted.
+        """
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not found")
+        model = self.models[model_name]
+        model.set_params(warm_start=True, n_estimators=model.n_estimators + k)
+        try:
+            with threadpool_limits(limits=1):
+                model.fit(X_train)
+        finally:
+            model.set_params(warm_start=False)
+        return model
+    
     def train_one_class_svm(self, X_train, X_val, y_val=None, **kwargs):
         """Train One-Class SVM for anomaly detection"""
         print("Training One-Class SVM...")
-        start_time = time.time()
-        
-        oc_svm = OneClassSVM(
-            nu=kwargs.get('nu', 0.1),  # Expected fraction of outliers
-            kernel=kwargs.get('kernel', 'rbf'),
-            gamma=kwargs.get('gamma', 'scale')
+        start_time = time.perf_counter()
+        
+        # RBF kernel approximated with Nystroem features + a linear SGD
+        # one-class SVM: linear in the number of samples, unlike libsvm
+        gamma = kwargs.get('gamma', 'scale')
+        if gamma == 'scale':
+            # Same heuristic as sklearn's OneClassSVM(gamma='scale')
+            # (computed on a plain array: np.var of a DataFrame is per-column)
+            gamma = 1.0 / (X_train.shape[1] * np.asarray(X_train, dtype=np.float64).var())
+        oc_svm = make_pipeline(
+            Nystroem(
+                kernel=kwargs.get('kernel', 'rbf'),
+                gamma=gamma,
+                n_components=min(kwargs.get('n_components', 200), len(X_train)),
+                random_state=42
+            ),
+            SGDOneClassSVM(
+                nu=kwargs.get('nu', 0.1),  # Expected fraction of outliers
+                random_state=42
+            )
         )
         
         oc_svm.fit(X_train)
@@ -103,7 +152,7 @@ class UnsupervisedModelTrainer:
             y_pred = (val_scores < threshold).astype(int)  # Lower scores = anomalies
             metrics = self._calculate_metrics(y_val, y_pred, -val_scores)
         
-        metrics['training_time'] = time.time() - start_time
+        metrics['training_time'] = time.perf_counter() - start_time
         metrics['threshold'] = threshold
         
         self.models['one_class_svm'] = oc_svm
@@ -118,12 +167,16 @@ class UnsupervisedModelTrainer:
     def train_autoencoder(self, X_train, X_val, y_val=None, **kwargs):
         """Train Autoencoder for anomaly detection"""
         print("Training Autoencoder...")
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         input_dim = X_train.shape[1]
         encoding_dim = kwargs.get('encoding_dim', max(3, input_dim // 4))
         
         if TENSORFLOW_AVAILABLE:
+            # Keras computes in float32; convert once up front
+            X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+            X_val = np.ascontiguousarray(X_val, dtype=np.float32)
+            
             # Build autoencoder
             input_layer = layers.Input(shape=(input_dim,))
             encoded = layers.Dense(encoding_dim * 2, activation='relu')(input_layer)
@@ -132,7 +185,13 @@ class UnsupervisedModelTrainer:
             decoded = layers.Dense(input_dim, activation='sigmoid')(decoded)
             
             autoencoder = keras.Model(input_layer, decoded)
-            autoencoder.compile(optimizer='adam', loss='mse')
+            # XLA fuses the Dense/ReLU stack into compiled kernels instead of
+            # dispatching each layer op separately per batch
+            autoencoder.compile(
+                optimizer='adam',
+                loss='mse',
+                jit_compile=kwargs.get('jit_compile', True)
+            )
             
             # Train
             history = autoencoder.fit(
@@ -147,8 +206,8 @@ class UnsupervisedModelTrainer:
             train_reconstructions = autoencoder.predict(X_train, verbose=0)
             val_reconstructions = autoencoder.predict(X_val, verbose=0)
             
-            train_errors = np.mean(np.square(X_train - train_reconstructions), axis=1)
-            val_errors = np.mean(np.square(X_val - val_reconstructions), axis=1)
+            train_errors = _reconstruction_errors(X_train, train_reconstructions)
+            val_errors = _reconstruction_errors(X_val, val_reconstructions)
             
             # Set threshold
             threshold = np.percentile(train_errors, 90)
@@ -160,7 +219,7 @@ class UnsupervisedModelTrainer:
                 y_pred = (val_errors > threshold).astype(int)
                 metrics = self._calculate_metrics(y_val, y_pred, val_errors)
             
-            metrics['training_time'] = time.time() - start_time
+            metrics['training_time'] = time.perf_counter() - start_time
             metrics['threshold'] = threshold
             metrics['history'] = history.history
             
@@ -172,9 +231,10 @@ class UnsupervisedModelTrainer:
             from sklearn.neural_network import MLPRegressor
             from sklearn.preprocessing import MinMaxScaler
             
-            scaler = MinMaxScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_val_scaled = scaler.transform(X_val)
+            # One float32 copy of the inputs, then scaled in place
+            scaler = MinMaxScaler(copy=False)
+            X_train_scaled = scaler.fit_transform(np.array(X_train, dtype=np.float32))
+            X_val_scaled = scaler.transform(np.array(X_val, dtype=np.float32))
             
             mlp = MLPRegressor(
                 hidden_layer_sizes=(encoding_dim * 2, encoding_dim, encoding_dim * 2),
@@ -188,8 +248,8 @@ class UnsupervisedModelTrainer:
             train_reconstructions = mlp.predict(X_train_scaled)
             val_reconstructions = mlp.predict(X_val_scaled)
             
-            train_errors = np.mean(np.square(X_train_scaled - train_reconstructions), axis=1)
-            val_errors = np.mean(np.square(X_val_scaled - val_reconstructions), axis=1)
+            train_errors = _reconstruction_errors(X_train_scaled, train_reconstructions)
+            val_errors = _reconstruction_errors(X_val_scaled, val_reconstructions)
             
             threshold = np.percentile(train_errors, 90)
             self.thresholds['autoencoder'] = threshold
@@ -199,7 +259,7 @@ class UnsupervisedModelTrainer:
                 y_pred = (val_errors > threshold).astype(int)
                 metrics = self._calculate_metrics(y_val, y_pred, val_errors)
             
-            metrics['training_time'] = time.time() - start_time
+            metrics['training_time'] = time.perf_counter() - start_time
             metrics['threshold'] = threshold
             
             self.models['autoencoder'] = {'model': mlp, 'scaler': scaler}
@@ -245,16 +305,17 @@ class UnsupervisedModelTrainer:
             confusion_matrix
         )
         
+        cm = confusion_matrix(y_true, y_pred)
         return {
             'accuracy': accuracy_score(y_true, y_pred),
             'precision': precision_score(y_true, y_pred, zero_division=0),
             'recall': recall_score(y_true, y_pred),
             'f1': f1_score(y_true, y_pred),
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
-            'tn': confusion_matrix(y_true, y_pred)[0, 0],
-            'fp': confusion_matrix(y_true, y_pred)[0, 1],
-            'fn': confusion_matrix(y_true, y_pred)[1, 0],
-            'tp': confusion_matrix(y_true, y_pred)[1, 1]
+            'confusion_matrix': cm.tolist(),
+            'tn': cm[0, 0],
+            'fp': cm[0, 1],
+            'fn': cm[1, 0],
+            'tp': cm[1, 1]
         }
     
     def predict_anomaly(self, model_name, X):
@@ -265,17 +326,13 @@ class UnsupervisedModelTrainer:
         model = self.models[model_name]
         threshold = self.thresholds.get(model_name, 0)
         
-        if model_name == 'isolation_forest':
-            scores = -model.decision_function(X)
-            return (scores > threshold).astype(int)
-        elif model_name == 'one_class_svm':
-            scores = model.decision_function(X)
-            return (scores < threshold).astype(int)
+        if model_name in ('isolation_forest', 'one_class_svm'):
+            return self.predict_anomaly_with_scores(model_name, X)[0]
         elif model_name == 'autoencoder':
             if TENSORFLOW_AVAILABLE:
                 try:
                     reconstructions = model.predict(X, verbose=0)
-                    errors = np.mean(np.square(X - reconstructions), axis=1)
+                    errors = _reconstruction_errors(X, reconstructions)
                 except:
                     # Fallback if model structure is different
                     return np.zeros(X.shape[0], dtype=int)
@@ -283,15 +340,33 @@ class UnsupervisedModelTrainer:
                 if isinstance(model, dict) and 'scaler' in model:
                     scaler = model['scaler']
                     model_mlp = model['model']
-                    X_scaled = scaler.transform(X)
+                    X_scaled = scaler.transform(np.array(X, dtype=np.float32))
                     reconstructions = model_mlp.predict(X_scaled)
-                    errors = np.mean(np.square(X_scaled - reconstructions), axis=1)
+                    errors = _reconstruction_errors(X_scaled, reconstructions)
                 else:
                     return np.zeros(X.shape[0], dtype=int)
             return (errors > threshold).astype(int)
         else:
             raise ValueError(f"Unknown model: {model_name}")
     
+    def predict_anomaly_with_scores(self, model_name, X):
+        """Anomaly predictions and the anomaly scores they were thresholded from
+        
+        Both come from a single decision_function pass (higher score = more
+        anomalous), so callers needing a confidence don't walk the trees twice.
+        """
+        if model_name not in self.models:
+            raise ValueError(f"Model {model_name} not found")
+        if model_name not in ('isolation_forest', 'one_class_svm'):
+            raise ValueError(f"Model {model_name} has no decision function")
+        
+        scores = -self.models[model_name].decision_function(X)
+        threshold = self.thresholds.get(model_name, 0)
+        if model_name == 'one_class_svm':
+            # Threshold was taken on the raw (lower = anomalous) SVM scores
+            threshold = -threshold
+        return (scores > threshold).astype(int), scores
+    
     def save_model(self, model_name, filepath):
         """Save a model to disk"""
         if model_name not in self.models:
@@ -299,7 +374,7 @@ class UnsupervisedModelTrainer:
         joblib.dump({
             'model': self.models[model_name],
             'threshold': self.thresholds.get(model_name)
-        }, filepath)
+        }, filepath, compress=MODEL_COMPRESSION)
     
     def load_model(self, model_name, filepath):
         """Load a model from disk"""
@@ -1,7 +1,8 @@
 """Script to save the hybrid detection engine as a pickle file"""
-import pickle
+import joblib
 from pathlib import Path
 from ml.models.hybrid import HybridDetectionEngine
+from ml.models.supervised import MODEL_COMPRESSION
 from app.config import settings
 # script for the hybrid model
 def save_hybrid_model():
@@ -17,8 +18,9 @@ def save_hybrid_model():
     model_path.parent.mkdir(parents=True, exist_ok=True)
     
     print(f"Saving hybrid model to {model_path}...")
-    with open(model_path, 'wb') as f:
-        pickle.dump(engine, f)
+    # joblib pickles with the highest protocol, writes the models' numpy
+    # arrays without intermediate copies and compresses the stream
+    joblib.dump(engine, model_path, compress=MODEL_COMPRESSION)
     
     print(f"✓ Hybrid model saved successfully to {model_path}")
     print(f"  - Supervised models: {len(engine.supervised_trainer.models)}")
@@ -0,0 +1,7 @@
+"""Make the backend packages (app, ml, data) importable from the tests"""
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+if str(backend_dir) not in sys.path:
+    sys.path.insert(0, str(backend_dir))
@@ -0,0 +1,122 @@
+"""DetectionEngine.detect_batch must reproduce detect_packet packet by packet"""
+import pytest
+
+from app.services import detection_engine
+from app.services.detection_engine import DECISION_PATHS, DetectionEngine
+
+
+class FakeMLService:
+    """Canned ML results keyed by source IP, identical for both entry points"""
+    
+    def __init__(self, results):
+        self.results = results
+    
+    def predict(self, packet_data):
+        return dict(self.results[packet_data['src_ip']])
+    
+    def predict_batch(self, packet_list):
+        return [self.predict(p) for p in packet_list]
+
+
+def _packet(src_ip, protocol, flags, size, port):
+    return {
+        'src_ip': src_ip,
+        'dst_ip': '10.0.0.1',
+        'Protocol': protocol,
+        'tcp_flags': flags,
+        'packet_size': size,
+        'dst_port': port,
+        'user_agent': '',
+    }
+
+
+def _ml(confidence, severity='low', attack_type='Normal', prediction=0):
+    return {
+        'is_malicious': confidence > 0.5,
+        'ml_confidence': confidence,
+        'severity': severity,
+        'attack_type': attack_type,
+        'supervised_prediction': prediction,
+        'unsupervised_prediction': prediction,
+        'unsupervised_confidence': confidence / 2,
+    }
+
+
+# One or more packets per decision path of _fuse_detections
+PACKETS = [
+    # SYN Flood (0.85) -> signature_high_confidence
+    _packet('192.168.1.1', 'TCP', 'S', 60, 8080),
+    # DNS Tunneling Suspect (0.70) confirmed by ML -> signature_ml_agreement
+    _packet('192.168.1.2', 'UDP', '', 600, 53),
+    # Same signature, ML says normal -> signature_ml_conflict
+    _packet('192.168.1.3', 'UDP', '', 600, 53),
+    # No signature, confident ML -> ml_high_confidence
+    _packet('192.168.1.4', 'TCP', 'A', 400, 8080),
+    # SSH Brute Force Port (0.50) is not above 0.5 -> ml_high_confidence
+    _packet('192.168.1.5', 'TCP', 'A', 400, 22),
+    # No signature, unsure ML -> ml_low_confidence
+    _packet('192.168.1.6', 'TCP', 'A', 400, 8080),
+    # Telnet Access (0.65) with ML at the 0.6 boundary -> signature_ml_conflict
+    _packet('192.168.1.7', 'TCP', 'A', 400, 23),
+    # SQL Injection Pattern (0.90) -> signature_high_confidence
+    {**_packet('192.168.1.8', 'TCP', 'PA', 400, 8080), 'user_agent': "' OR 1=1"},
+]
+
+ML_RESULTS = {
+    '192.168.1.1': _ml(0.2),
+    '192.168.1.2': _ml(0.9, 'high', 'DoS', 1),
+    '192.168.1.3': _ml(0.3),
+    '192.168.1.4': _ml(0.95, 'critical', 'Exploit', 1),
+    '192.168.1.5': _ml(0.75, 'medium', 'Brute Force', 1),
+    '192.168.1.6': _ml(0.1),
+    '192.168.1.7': _ml(0.6, 'medium', 'Probe', 1),
+    '192.168.1.8': _ml(0.4),
+}
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(detection_engine, 'get_ml_service', lambda: FakeMLService(ML_RESULTS))
+    engine = DetectionEngine()
+    assert engine.signature_detector is not None
+    return engine
+
+
+def test_batch_records_match_detect_packet(engine):
+    expected = [engine.detect_packet(p) for p in PACKETS]
+    
+    assert engine.detect_batch(PACKETS).to_records() == expected
+
+
+def test_batch_covers_every_decision_path(engine):
+    records = engine.detect_batch(PACKETS).to_records()
+    
+    assert {r['decision_path'] for r in records} == set(DECISION_PATHS)
+
+
+def test_batch_statistics_match_detect_packet(engine):
+    for p in PACKETS:
+        engine.detect_packet(p)
+    per_packet = engine.get_statistics()
+    
+    engine.reset_statistics()
+    engine.detect_batch(PACKETS)
+    
+    assert engine.get_statistics() == per_packet
+
+
+def test_severity_counts(engine):
+    result = engine.detect_batch(PACKETS)
+    counts = result.severity_counts()
+    
+    assert len(result) == len(PACKETS)
+    assert sum(counts.values()) == len(PACKETS)
+    for severity, count in counts.items():
+        assert count == sum(r['severity'] == severity for r in result.to_records())
+
+
+def test_empty_batch(engine):
+    result = engine.detect_batch([])
+    
+    assert len(result) == 0
+    assert result.to_records() == []
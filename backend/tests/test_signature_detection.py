@@ -0,0 +1,75 @@
+"""Per-row and batch signature detection must agree on every packet"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.models.signature_detection import SignatureDetector
+
+
+# Mixed-type rows: numeric strings, fractional and out-of-range ports,
+# missing values and non-numeric junk next to plain numbers
+MIXED_ROWS = [
+    {'Protocol': 'TCP', 'tcp_flags': 'S', 'packet_size': 60, 'dst_port': 23},
+    {'Protocol': 'TCP', 'tcp_flags': 'S', 'packet_size': '60', 'dst_port': '23'},
+    {'Protocol': 'tcp', 'tcp_flags': 'PA', 'packet_size': '1500.5', 'dst_port': '80'},
+    {'Protocol': 'UDP', 'tcp_flags': '', 'packet_size': 1450, 'dst_port': 23.5},
+    {'Protocol': 'UDP', 'tcp_flags': '', 'packet_size': 600, 'dst_port': 53.0},
+    {'Protocol': 'UDP', 'tcp_flags': '', 'packet_size': 600, 'dst_port': '53.5'},
+    {'Protocol': 'ICMP', 'tcp_flags': None, 'packet_size': 1200, 'dst_port': 2047.5},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 'n/a', 'dst_port': 'abc'},
+    {'Protocol': None, 'tcp_flags': 'A', 'packet_size': None, 'dst_port': None},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': 70000},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': -3.5},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': '3306'},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': 3306.25,
+     'request_type': 'http'},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': '8080',
+     'request_type': 'HTTP'},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': 8080,
+     'user_agent': "' OR 1=1"},
+    {'Protocol': 'TCP', 'tcp_flags': 'A', 'packet_size': 400, 'dst_port': 4444,
+     'user_agent': '<script>alert(1)</script>'},
+]
+
+
+@pytest.fixture(scope='module')
+def detector():
+    return SignatureDetector()
+
+
+def _per_row(detector, df):
+    return [
+        {
+            'signature_detected': is_attack,
+            'signature_confidence': confidence,
+            'signature_name': name,
+        }
+        for is_attack, confidence, name in (detector.detect(row) for _, row in df.iterrows())
+    ]
+
+
+def test_batch_matches_per_row_on_mixed_types(detector):
+    df = pd.DataFrame(MIXED_ROWS)
+
+    assert detector.detect_batch(df) == _per_row(detector, df)
+
+
+def test_batch_matches_per_row_on_numeric_columns(detector):
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        'Protocol': rng.choice(['TCP', 'UDP', 'ICMP'], size=n),
+        'tcp_flags': rng.choice(['S', 'SA', 'A', 'PA', ''], size=n),
+        'packet_size': rng.uniform(0, 2000, size=n),
+        'dst_port': rng.choice([22, 23, 53, 80, 443, 1023, 1024, 3306, 8080, 31337], size=n)
+                    + rng.choice([0.0, 0.0, 0.5], size=n),
+    })
+
+    assert detector.detect_batch(df) == _per_row(detector, df)
+
+
+def test_numeric_strings_match_numbers(detector):
+    as_numbers = detector.detect({'Protocol': 'UDP', 'packet_size': 600, 'dst_port': 53})
+    as_strings = detector.detect({'Protocol': 'UDP', 'packet_size': '600', 'dst_port': '53'})
+
+    assert as_strings == as_numbers == (True, 0.70, 'DNS Tunneling Suspect')